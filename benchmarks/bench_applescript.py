@@ -0,0 +1,63 @@
+"""Compile vs. execute cost of typical AppleScript queries (macOS only).
+
+For each script report the time to compile it, to execute the compiled script and to do both
+per call (what every `AppleScriptWrapper.execute` call cost before the compiled script cache),
+along with the cache statistics of running a repeated mix of the queries.
+
+Usage: PYTHONPATH=src python benchmarks/bench_applescript.py [process]
+"""
+import sys
+import time
+
+from macuitest.lib.applescript_lib.applescript_wrapper import AppleScriptWrapper
+
+PROCESS = sys.argv[1] if len(sys.argv) > 1 else "Finder"
+LOCATOR = "window 1"
+SCRIPTS = {
+    "exists": f"exists {LOCATOR}",
+    "AXPosition": f'get value of attribute "AXPosition" of {LOCATOR}',
+    "AXSize": f'get value of attribute "AXSize" of {LOCATOR}',
+    "UI elements": f"count of UI elements of {LOCATOR}",
+}
+REPEATS = 50
+
+
+def tell(command: str) -> str:
+    return f'tell app "System Events" to tell application process "{PROCESS}" to {command}'
+
+
+def timed(func, repeats: int = REPEATS) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    wrapper = AppleScriptWrapper()
+    print(f"{'script':<14}{'compile':>10}{'execute':>10}{'both':>10}  (ms per call, {PROCESS})")
+    for name, command in SCRIPTS.items():
+        source = tell(command)
+        script = wrapper.compile(source)
+        compile_ms = timed(lambda: wrapper.compile(source))
+        execute_ms = timed(lambda: script.executeAndReturnError_(None))
+        both_ms = timed(lambda: wrapper.compile(source).executeAndReturnError_(None))
+        print(f"{name:<14}{compile_ms:>10.2f}{execute_ms:>10.2f}{both_ms:>10.2f}")
+
+    for size in (1, 2, 4, 8):
+        cached = AppleScriptWrapper(cache_size=size)
+        sources = [tell(command) for command in SCRIPTS.values()]
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            for source in sources:
+                cached.execute(source)
+        spent = time.perf_counter() - started
+        stats = cached.script_cache.stats
+        print(
+            f"cache size {size}: {spent:.2f}s, hit rate {stats.hit_rate:.0%}, "
+            f"compile time saved {stats.saved_time:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
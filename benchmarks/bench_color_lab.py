@@ -0,0 +1,45 @@
+"""Compare the RGB and the perceptual (CIELAB, CIE94) color engines on synthetic regions,
+and show the colors they classify differently.
+
+Usage: PYTHONPATH=src python benchmarks/bench_color_lab.py
+"""
+import time
+
+import numpy
+from bench_color_meter import REGIONS
+from bench_color_meter import synthetic_region
+
+from macuitest.lib.operating_system.color_lab import dominant_colors
+from macuitest.lib.operating_system.color_lab import lab_tables
+from macuitest.lib.operating_system.color_meter import most_common_color
+from macuitest.lib.operating_system.color_table import color_tables
+
+GREYS_AND_PASTELS = ((200, 200, 210), (128, 128, 140), (230, 220, 235), (175, 190, 175))
+
+
+def timed(func, *args, repeat: int = 5, **kwargs):
+    func(*args, **kwargs)  # Warm up, fills the per-color caches.
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args, **kwargs)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    print(f'{"region":>16} {"rgb, ms":>8} {"lab, ms":>8} {"k-means, ms":>12}  dominant colors')
+    for name, (height, width) in REGIONS.items():
+        pixels = synthetic_region(height, width)
+        rgb, _ = timed(most_common_color, pixels)
+        lab, _ = timed(most_common_color, pixels, engine="lab")
+        kmeans, dominant = timed(dominant_colors, pixels)
+        shares = ", ".join(f"{color} {share:.0f}%" for color, share in dominant)
+        print(f"{name:>16} {rgb:>8.2f} {lab:>8.2f} {kmeans:>12.2f}  {shares}")
+    colors = numpy.array(GREYS_AND_PASTELS, dtype=numpy.uint8)
+    rgb, lab = color_tables.get(), lab_tables.get()
+    print(f'\n{"color":>16} {"rgb":>16} {"lab":>16}')
+    for color, i, j in zip(GREYS_AND_PASTELS, rgb.lookup(colors), lab.lookup(colors)):
+        print(f"{str(color):>16} {rgb.names[i]:>16} {lab.names[j]:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the per-pixel multiprocessing color lookup with the vectorized one on synthetic regions.
+
+Usage: PYTHONPATH=src python benchmarks/bench_color_meter.py
+"""
+import multiprocessing
+import time
+from collections import Counter
+
+import cv2
+import numpy
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.lib.operating_system.color_meter import most_common_color
+
+REGIONS = {"icon 20x20": (20, 20), "button 300x200": (200, 300), "panel 800x600": (600, 800)}
+
+
+def synthetic_region(height: int, width: int, seed: int = 0) -> numpy.ndarray:
+    """Draw an anti-aliased button-like RGB image: a filled rounded box with a label."""
+    rng = numpy.random.default_rng(seed)
+    region = numpy.full((height, width, 3), (236, 236, 236), dtype=numpy.uint8)
+    cv2.rectangle(region, (2, 2), (width - 3, height - 3), (0, 122, 255), -1, cv2.LINE_AA)
+    for _ in range(max(1, width // 60)):
+        x, y = int(rng.integers(0, width)), int(rng.integers(height // 4, height))
+        cv2.putText(region, "OK", (x, y), 0, height / 80, (255, 255, 255), 1, cv2.LINE_AA)
+    return region
+
+
+def closest_color(pixel) -> str:
+    """get_closest_color as it used to be."""
+    min_colours = dict()
+    pr, pg, pb = (int(c) for c in pixel)
+    for name, cr, cg, cb in CSS3_COLORS:
+        min_colours[abs(cr - pr) + abs(cg - pg) + abs(cb - pb)] = name
+    return min_colours[min(min_colours)]
+
+
+def before(pixels: numpy.ndarray) -> str:
+    height, width = pixels.shape[:2]
+    with multiprocessing.Pool() as pool:
+        colors = pool.map(
+            closest_color, list(pixels[y, x] for x in range(width) for y in range(height))
+        )
+    return Counter(colors).most_common()[0][0]
+
+
+def timed(func, *args, repeat: int = 3):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    print(f'{"region":>16} {"before, ms":>11} {"after, ms":>10} {"speedup":>8}  color')
+    for name, (height, width) in REGIONS.items():
+        pixels = synthetic_region(height, width)
+        old, old_color = timed(before, pixels, repeat=1)
+        new, new_color = timed(most_common_color, pixels)
+        assert old_color == new_color, (old_color, new_color)
+        print(f"{name:>16} {old:>11.1f} {new:>10.2f} {old / new:>7.0f}x  {new_color}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Delay budget of the pacing profiles.
+
+For a typical mix of UI actions, report the time each profile spends in fixed delays and what
+it saves against the "default" profile. Profiles with settle waits spend some of the savings
+on those, a real run reports the net figure:
+
+    pacing.use("fast")
+    ...  # The suite.
+    print(pacing.saved(), pacing.stats)
+
+Usage: PYTHONPATH=src python benchmarks/bench_pacing.py
+"""
+from macuitest.lib.elements.controllers.pacing import PROFILES
+from macuitest.lib.elements.controllers.pacing import PacingStats
+
+# Profile delays taken by one action, as the controllers and elements take them.
+ACTIONS = {
+    "click": ("pause", "move", "after_move", "before_press", "hold", "after_press"),
+    "hotkey x3": ("key",) * 6,
+    "element press": ("element_pause", "after_action"),
+    "text fill": ("focus",),
+    "drag": ("move", "after_move", "drag_hold", "drag", "after_move", "drag_hold", "after_press"),
+}
+SUITE = {"click": 500, "hotkey x3": 200, "element press": 300, "text fill": 100, "drag": 20}
+
+
+def suite_stats() -> PacingStats:
+    stats = PacingStats()
+    for action, times in SUITE.items():
+        for name in ACTIONS[action]:
+            stats.delays[name] = stats.delays.get(name, 0) + times
+    return stats
+
+
+def main():
+    stats = suite_stats()
+    baseline = stats.cost(PROFILES["default"])
+    print(f"{'profile':<10}" + "".join(f"{action:>15}" for action in ACTIONS) + f"{'suite':>12}")
+    for name, profile in PROFILES.items():
+        per_action = (sum(getattr(profile, delay) for delay in ACTIONS[a]) for a in ACTIONS)
+        row = "".join(f"{seconds * 1000:>13.0f}ms" for seconds in per_action)
+        suite = stats.cost(profile)
+        print(f"{name:<10}{row}{suite:>10.1f}s  saves {baseline - suite:.1f}s")
+    print("suite: " + ", ".join(f"{times} x {action}" for action, times in SUITE.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark the vision hot paths (template matching, color lookup, OCR) on recorded screens.
+Frames are served by `ReplayFrameSource`, so no macOS session is needed.
+A recording is a folder of PNG/NPY frames (e.g. saved with `monitor.dump_frames`) or an `.npy`
+stack of frames; with no recording a synthetic one is generated.
+
+Usage: PYTHONPATH=src python benchmarks/bench_replay.py [recording] [--scale 2]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy
+
+from macuitest.config.constants import Point
+from macuitest.config.constants import Region
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.matching import find_matches
+from macuitest.lib.elements.ui.matching import match_template
+from macuitest.lib.elements.ui.matching import match_template_pyramid
+from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.operating_system import color_meter
+
+REPEAT = 5
+
+
+def synthetic_recording(where: Path, frames: int = 4, size=(1800, 2880)) -> Path:
+    """Record a few desktop-like frames with a window moving across them."""
+    rng = numpy.random.default_rng(0)
+    height, width = size
+    background = numpy.full((height, width, 3), 236, dtype=numpy.uint8)
+    for _ in range(height * width // 20000):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 60))
+        w, h = int(rng.integers(20, 200)), int(rng.integers(12, 60))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(background, (x, y), (x + w, y + h), color, -1)
+        cv2.putText(background, str(rng.integers(0, 10 ** 6)), (x + 2, y + h - 2), 0, 0.6, 0, 1)
+    for i in range(frames):
+        frame = background.copy()
+        x, y = width // 4 + i * 40, height // 3
+        cv2.rectangle(frame, (x, y), (x + 400, y + 240), (250, 250, 250), -1)
+        cv2.rectangle(frame, (x, y), (x + 400, y + 240), (90, 90, 90), 2)
+        cv2.putText(frame, "Replay", (x + 40, y + 130), 0, 2.0, (40, 40, 200), 3)
+        cv2.imwrite(str(where.joinpath(f"frame_{i:03}.png")), frame)
+    return where
+
+
+def timed(func, *args, **kwargs):
+    func(*args, **kwargs)  # Warm up.
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func(*args, **kwargs)
+    return (time.perf_counter() - started) / REPEAT * 1000, result
+
+
+def report(name: str, elapsed: float, result) -> None:
+    if isinstance(result, numpy.ndarray):
+        result = f"{result.shape} {result.dtype}"
+    print(f"{name:<32} {elapsed:>9.2f} ms   {result}")
+
+
+def bench_matching() -> None:
+    screen = monitor.make_snapshot(grayscale=True)
+    h, w = screen.shape
+    template = screen[h // 3 : h // 3 + 120, w // 4 : w // 4 + 200].copy()
+    report("snapshot (grayscale)", *timed(monitor.make_snapshot, grayscale=True))
+    report("match_template", *timed(match_template, screen, template))
+    report("match_template_pyramid", *timed(match_template_pyramid, screen, template, 0.925))
+    elapsed, matches = timed(find_matches, screen, template, 0.925)
+    report("find_matches", elapsed, f"{len(matches)} match(es)")
+
+
+def bench_colors() -> None:
+    size = monitor.size
+    center = Point(size.width // 2, size.height // 2)
+    report("get_color", *timed(color_meter.get_color, center))
+    area = (center.x, center.y, center.x + 40, center.y + 40)
+    report("get_most_common_color 40x40", *timed(color_meter.get_most_common_color, *area))
+
+
+def bench_ocr() -> None:
+    try:
+        from macuitest.lib.elements.ui.ocr_manager import ocr_manager
+    except (ImportError, FileNotFoundError) as error:
+        print(f"OCR skipped: {error!r}")
+        return
+    size = monitor.size
+    region = Region(0, 0, size.width // 2, size.height // 2)
+    report("OCR recognize", *timed(ocr_manager.recognize, region))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", help="Recorded frames, synthetic if omitted")
+    parser.add_argument("--scale", type=int, default=2, help="Pixels per screen point")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        recording = args.recording or synthetic_recording(Path(folder))
+        source = ReplayFrameSource(recording, scale=args.scale)
+        for position in range(len(source)):
+            source.frame(position)  # Decode the recording up front, it is not what is measured.
+        monitor.set_source(source)
+        print(f"{recording}: {len(monitor.source)} frame(s), {monitor.size}")
+        bench_matching()
+        bench_colors()
+        bench_ocr()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure bytes allocated per snapshot by the old and the buffer-reusing conversion paths.
+The capture itself (CGDataProviderCopyData) is simulated with a bytes object of the same layout.
+
+"before"/"after" time the conversion alone: "after" writes into a caller's `out` array.
+"poll" is one tick of a polling wait (`UIElement` waits, `ScreenMatcher`, the settle probe, OCR
+waits) on a replayed screen: a `SnapshotBuffer` snapshot compared by a `FrameChangeDetector`.
+One-off lookups (`detect_on_screen`, `find_all`, `ocr_manager.recognize`) still allocate a new
+grayscale array per call.
+
+Usage: PYTHONPATH=src python benchmarks/bench_snapshot_memory.py
+"""
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy
+
+from macuitest.lib.elements.ui.frame_change import FrameChangeDetector
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import Monitor
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
+from macuitest.lib.elements.ui.pixels import bgra_view
+from macuitest.lib.elements.ui.pixels import convert
+
+DISPLAYS = {"1440x900@2x": (2880, 1800), "5K": (5120, 2880)}
+REPEAT = 10
+
+
+def provider_bytes(width: int, height: int) -> bytes:
+    bytes_per_row = (width * 4 + 63) // 64 * 64  # CoreGraphics pads rows.
+    rng = numpy.random.default_rng(0)
+    return rng.integers(0, 255, bytes_per_row * height, numpy.uint8).tobytes()
+
+
+def before(data, width: int, height: int) -> numpy.ndarray:
+    """Monitor.make_snapshot + the caller's cvtColor as they used to be."""
+    bytes_per_row = len(data) // height
+    image = numpy.frombuffer(data, dtype=numpy.uint8).reshape((height, bytes_per_row // 4, 4))
+    return cv2.cvtColor(image[:, :width, :], cv2.COLOR_BGR2GRAY)
+
+
+def after(data, width: int, height: int, out: numpy.ndarray) -> numpy.ndarray:
+    return convert(bgra_view(data, width, height, len(data) // height), grayscale=True, out=out)
+
+
+def poll(buffer: SnapshotBuffer, detector: FrameChangeDetector) -> None:
+    detector.update(buffer.take())
+
+
+def measure(func, *args):
+    func(*args)  # Warm up.
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        func(*args)
+    elapsed = (time.perf_counter() - started) / REPEAT * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    print(f'{"display":>12} {"path":>7} {"ms":>7} {"allocated per snapshot, MB":>27}')
+    for name, (width, height) in DISPLAYS.items():
+        data = provider_bytes(width, height)
+        out = numpy.empty((height, width), dtype=numpy.uint8)
+        with tempfile.TemporaryDirectory() as folder:
+            recording = Path(folder).joinpath("screen.npy")
+            numpy.save(recording, numpy.zeros((1, height, width, 4), numpy.uint8))
+            buffer = SnapshotBuffer(screen=Monitor(ReplayFrameSource(recording)))
+            for path, args in (
+                ("before", (before, data, width, height)),
+                ("after", (after, data, width, height, out)),
+                ("poll", (poll, buffer, FrameChangeDetector())),
+            ):
+                elapsed, peak = measure(*args)
+                print(f"{name:>12} {path:>7} {elapsed:>7.1f} {peak / 1e6:>27.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare single-scale and pyramid template matching on synthetic screens.
+
+Usage: PYTHONPATH=src python benchmarks/bench_template_matching.py
+"""
+import time
+
+import cv2
+import numpy
+
+from macuitest.lib.elements.ui.matching import match_template
+from macuitest.lib.elements.ui.matching import match_template_pyramid
+
+SCREENS = {"1440x900@2x": (1800, 2880), "5K": (2880, 5120)}
+TEMPLATES = {"icon": (48, 48), "button": (56, 160), "panel": (240, 360)}
+REPEAT = 5
+
+
+def synthetic_screen(height: int, width: int, seed: int = 0) -> numpy.ndarray:
+    """Draw a desktop-like grayscale image: flat background, boxes and text."""
+    rng = numpy.random.default_rng(seed)
+    screen = numpy.full((height, width), 236, dtype=numpy.uint8)
+    for _ in range(height * width // 20000):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 60))
+        w, h = int(rng.integers(20, 200)), int(rng.integers(12, 60))
+        cv2.rectangle(screen, (x, y), (x + w, y + h), int(rng.integers(0, 255)), -1)
+        cv2.putText(
+            screen, str(rng.integers(0, 10 ** 6)), (x + 2, y + h - 2), 0, 0.6, 0, 1, cv2.LINE_AA
+        )
+    return screen
+
+
+def place_widget(screen: numpy.ndarray, height: int, width: int, seed: int = 1) -> numpy.ndarray:
+    """Draw a unique widget in the middle of `screen` and return a copy of it as a template."""
+    rng = numpy.random.default_rng(seed)
+    widget = numpy.full((height, width), 250, dtype=numpy.uint8)
+    cv2.rectangle(widget, (1, 1), (width - 2, height - 2), 90, 2)
+    for _ in range(6):
+        cx, cy = int(rng.integers(4, width - 4)), int(rng.integers(4, height - 4))
+        cv2.circle(widget, (cx, cy), int(rng.integers(3, min(height, width) // 3)), 40, -1)
+    y, x = screen.shape[0] // 3, screen.shape[1] // 2
+    screen[y : y + height, x : x + width] = widget
+    return widget
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func(*args)
+    return (time.perf_counter() - started) / REPEAT * 1000, result
+
+
+def main():
+    print(f'{"screen":>12} {"template":>8} {"single, ms":>11} {"pyramid, ms":>12} {"dx,dy":>6}')
+    for screen_name, (height, width) in SCREENS.items():
+        screen = synthetic_screen(height, width)
+        for template_name, (t_height, t_width) in TEMPLATES.items():
+            template = place_widget(screen, t_height, t_width)
+            single_ms, (_, single) = timed(match_template, screen, template)
+            pyramid_ms, (_, pyramid) = timed(match_template_pyramid, screen, template, 0.925)
+            delta = f"{abs(single[0] - pyramid[0])},{abs(single[1] - pyramid[1])}"
+            print(
+                f"{screen_name:>12} {template_name:>8} {single_ms:>11.1f} {pyramid_ms:>12.1f}"
+                f" {delta:>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Micro-benchmarks of the wait_condition polling loop and its strategies.
+
+For a cheap and an expensive predicate (a stand-in for a screen capture or an AppleScript
+call) that turns true after a while, report the time to success, the number of predicate
+calls and the CPU time the wait burned.
+
+Usage: PYTHONPATH=src python benchmarks/bench_wait_condition.py
+"""
+import time
+
+from macuitest.lib.core import CostProportional
+from macuitest.lib.core import ExponentialBackoff
+from macuitest.lib.core import FixedInterval
+from macuitest.lib.core import WaitStats
+from macuitest.lib.core import wait_condition
+
+STRATEGIES = {
+    "fixed 5 ms": FixedInterval(0.005),
+    "fixed 0": FixedInterval(0.0),
+    "backoff": ExponentialBackoff(),
+    "cost x1": CostProportional(),
+}
+PREDICATES = {"cheap": 0.0, "expensive 30 ms": 0.03}
+READY_AFTER = 0.5  # Seconds until the condition is met.
+
+
+def busy(seconds: float) -> None:
+    """Burn CPU like a capture-and-match predicate does."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def condition(cost: float):
+    ready = time.monotonic() + READY_AFTER
+
+    def predicate():
+        busy(cost)
+        return time.monotonic() >= ready
+
+    return predicate
+
+
+def overhead(repeat: int = 100000) -> float:
+    """Loop overhead per call of a predicate that is true right away, in microseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        wait_condition(bool, 1, (), 1)
+    return (time.perf_counter() - started) / repeat * 10 ** 6
+
+
+def main():
+    print(f"wait_condition overhead: {overhead():.2f} us per call\n")
+    print(f'{"predicate":>16} {"strategy":>11} {"success, ms":>12} {"calls":>6} {"CPU, ms":>8}')
+    for name, cost in PREDICATES.items():
+        for strategy, poll in STRATEGIES.items():
+            stats, cpu = WaitStats(), time.process_time()
+            wait_condition(condition(cost), timeout=5, poll_strategy=poll, wait_stats=stats)
+            cpu = (time.process_time() - cpu) * 1000
+            success = stats.time_to_success * 1000
+            print(f"{name:>16} {strategy:>11} {success:>12.1f} {stats.attempts:>6} {cpu:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Asyncio counterparts of the blocking waits.
+Blocking predicates and calls (AppleScript, accessibility, screen captures) run in a thread
+pool, so a single coroutine can race several UI conditions and background checks:
+
+    done, _ = await asyncio.wait(
+        [dialog.wait_displayed_async(), spinner.wait_vanish_async()],
+        return_when=asyncio.FIRST_COMPLETED,
+    )
+"""
+import asyncio
+import functools
+import sys
+import time
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+from macuitest.lib import core
+from macuitest.lib.core import PollStrategy
+from macuitest.lib.core import WaitConditionException
+from macuitest.lib.core import WaitStats
+
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="macuitest")
+# AppleScript calls are serialized: NSAppleScript must not run concurrently.
+applescript_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="macuitest-as")
+
+
+async def run_blocking(func: Callable, *args, executor: Executor = executor, **kwargs) -> Any:
+    """Run the blocking `func` in `executor` and wait for its result without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def to_async(func: Callable, executor: Executor = executor) -> Callable:
+    """Wrap the blocking `func` into a coroutine function, e.g. `to_async(element.click_mouse)`."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, executor=executor, **kwargs)
+
+    return wrapper
+
+
+async def wait_condition(
+    predicate: Callable,
+    timeout: Union[int, float] = 10,
+    exceptions: tuple = (WaitConditionException,),
+    *args,
+    poll_strategy: Optional[PollStrategy] = None,
+    wait_stats: Optional[WaitStats] = None,
+    wait_label: Optional[str] = None,
+    executor: Executor = executor,
+    **kwargs,
+) -> Any:
+    """Asynchronous `core.wait_condition`: same polling strategies, final attempt and stats.
+    `predicate` is either a coroutine function or a blocking callable run in `executor`."""
+    label = wait_label
+    if core.wait_recorder is not None and label is None:
+        label = core.call_site(sys._getframe(1))  # Only valid before the first suspension.
+    stats = wait_stats if wait_stats is not None else WaitStats()
+    poll = poll_strategy or core.default_poll_strategy
+    if not asyncio.iscoroutinefunction(predicate):
+        predicate = to_async(predicate, executor)
+    started = time.monotonic()
+    deadline = started + timeout
+    result = None
+    while timeout > 0:
+        spent = stats.predicate_time
+        result, finished = await _attempt(predicate, exceptions, stats, args, kwargs)
+        stats.elapsed = finished - started
+        if result or finished >= deadline:
+            break
+        delay = poll.delay(stats.attempts, stats.predicate_time - spent)
+        await asyncio.sleep(min(delay, deadline - finished))
+    stats.succeeded = bool(result)
+    if core.wait_recorder is not None:
+        core.wait_recorder.record(label or "unknown", timeout, stats)
+    return result or False
+
+
+async def _attempt(predicate: Callable, exceptions: tuple, stats: WaitStats, args, kwargs):
+    started = time.monotonic()
+    stats.attempts += 1
+    try:
+        result = await predicate(*args, **kwargs)
+    except exceptions:
+        stats.exceptions += 1
+        result = None
+    finished = time.monotonic()
+    stats.predicate_time += finished - started
+    return result, finished
@@ -1,11 +1,31 @@
+import threading
 import time
+import types
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
 
+from Foundation import NSAppleEventDescriptor
 from Foundation import NSAppleScript
 from Foundation import NSAppleScriptErrorBriefMessage
 from Foundation import NSAppleScriptErrorMessage
 from Foundation import NSAppleScriptErrorNumber
 
+from macuitest.lib.applescript_lib import aeobjects
+from macuitest.lib.applescript_lib.aeconverter import AEType
 from macuitest.lib.applescript_lib.aeconverter import ae_converter
+from macuitest.lib.applescript_lib.aeconverter import four_characters_code
+from macuitest.lib.applescript_lib.batch import BatchedCommand
+from macuitest.lib.applescript_lib.batch import CommandQueue
+from macuitest.lib.applescript_lib.batch import batch_script
+from macuitest.lib.applescript_lib.script_cache import ScriptCache
+from macuitest.lib.elements.controllers.input_events import input_events
+
+# NSAppleScript objects are not thread-safe and the compiled ones are shared between the caller
+# thread and the `applescript_executor` of `aio`: they are compiled and run under this lock.
+_script_lock = threading.RLock()
 
 
 class AppleScriptError(Exception):
@@ -30,6 +50,65 @@ class AppleScriptError(Exception):
         return self._error_info.get(NSAppleScriptErrorNumber)
 
 
+class AppleScriptBatchError(AppleScriptError):
+    """Statements of a batch failed. `failures` are the failed commands,
+    each with its `error` and the `origin` of the call that queued it."""
+
+    def __init__(self, failures: List[BatchedCommand]):
+        message = "; ".join(f"{f.origin}: {f.error.message}" for f in failures)
+        number = failures[0].error.number
+        super().__init__({NSAppleScriptErrorMessage: message, NSAppleScriptErrorNumber: number})
+        self.failures = failures
+
+
+class ScriptLibrary:
+    """A script of handlers compiled once and called through Apple events, e.g.
+
+        library = ScriptLibrary('on greet(name)\\nreturn "Hello, " & name\\nend greet')
+        library.call("greet", 'Bobby "Tables"')
+
+    The arguments travel packed in the event, so neither recompiling nor quoting is needed
+    when they change."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.script = AppleScriptWrapper.compile(source)
+
+    def call(self, handler: str, *args) -> Any:
+        """Run `handler` with positional `args` and return its result."""
+        event = NSAppleEventDescriptor.appleEventWithEventClass_eventID_targetDescriptor_returnID_transactionID_(  # noqa: E501
+            four_characters_code(aeobjects.kASAppleScriptSuite),
+            four_characters_code(aeobjects.kASSubroutineEvent),
+            NSAppleEventDescriptor.currentProcessDescriptor(),
+            aeobjects.kAutoGenerateReturnID,
+            aeobjects.kAnyTransactionID,
+        )
+        event.setParamDescriptor_forKeyword_(  # Handler names are case-insensitive.
+            NSAppleEventDescriptor.descriptorWithString_(handler.lower()),
+            four_characters_code(aeobjects.keyASSubroutineName),
+        )
+        event.setParamDescriptor_forKeyword_(
+            ae_converter.pack(list(args)), four_characters_code(aeobjects.keyDirectObject)
+        )
+        with _script_lock:
+            result, error = self.script.executeAppleEvent_error_(event, None)
+        if error:
+            raise AppleScriptError(error)
+        return ae_converter.unpack(result)
+
+
+class _SharedMethod:
+    """A method also callable on the class, e.g. `AppleScriptWrapper.execute(source)`,
+    that runs on the shared `as_wrapper` then."""
+
+    def __init__(self, function):
+        self.__function = function
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        return types.MethodType(self.__function, as_wrapper if instance is None else instance)
+
+
 class AppleScriptWrapper:
     """Wrapper for AppleScript with a set of easy to use methods."""
 
@@ -46,6 +125,36 @@ class AppleScriptWrapper:
     }
     __pass_as_key_code = {'"': (39, True), "'": (39, False)}
 
+    def __init__(self, cache_size: int = 256):
+        self.script_cache = ScriptCache(self.compile, max_size=cache_size)
+        self.libraries = ScriptCache(ScriptLibrary, max_size=cache_size)
+        self.__queue = CommandQueue(
+            self.__run_batch,
+            error=lambda message, number: AppleScriptError(
+                {NSAppleScriptErrorMessage: message, NSAppleScriptErrorNumber: number}
+            ),
+            batch_error=AppleScriptBatchError,
+        )
+
+    @property
+    def is_batching(self) -> bool:
+        return self.__queue.is_batching
+
+    def batch(self):
+        """Queue the element commands issued inside the block and run them as one script
+        when it ends. Any other call, keyboard or mouse event runs the queued commands first.
+        Nested blocks join the outer one; when the block raises, the queued commands are dropped.
+        :raise AppleScriptBatchError: If some of the commands failed."""
+        return self.__queue.batch()
+
+    def flush(self) -> None:
+        """Run the commands queued so far by `batch`."""
+        self.__queue.flush()
+
+    def __run_batch(self, commands: List[BatchedCommand]) -> list:
+        library = self.libraries.get(batch_script(commands))
+        return library.call("run_batch", [list(command.args) for command in commands])
+
     def typewrite(self, phrase: str) -> None:
         """Type `phrase` with a delay between key presses."""
         for char in phrase:
@@ -70,40 +179,104 @@ class AppleScriptWrapper:
         for modifier in args:
             if modifier not in self.allowed_modifier_keys:
                 raise KeyError(f'{modifier} is not a modifier key.')
-        _cmd = f'{event_type} "{message}"'
+        _cmd = f"{event_type} arg1"
         if args:
             _cmd = (
-                f'{event_type} "{message}" using '
+                f"{event_type} arg1 using "
                 f'{{{", ".join([f"{modifier_key} down" for modifier_key in args])}}}'
             )
-        return self.tell_sys_events(_cmd)
+        try:
+            return self.tell_sys_events(_cmd, args=(message,))
+        finally:
+            input_events.notify()
 
-    def tell_app_process(self, command: str, app_process: str):
-        return self.execute(
+    def tell_app_process(
+        self, command: str, app_process: str, args: Sequence = (), queue: bool = False
+    ):
+        """:param queue: Queue the command inside a `batch` block instead of running it."""
+        statement = (
             f'tell app "System Events" to tell application process "{app_process}" to {command}'
         )
+        if queue and self.is_batching:
+            return self.__queue.add(statement, args)
+        return self.__tell(statement, args)
 
-    def tell_app(self, app: str, command: str, ignoring_responses: bool = False):
+    def read_attributes(
+        self, locator: str, app_process: str, attributes: Sequence[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Check that the UI element at `locator` exists and read its `attributes` in one script.
+        :return: None if there is no such element, the values by attribute name otherwise;
+                 attributes the element does not have read as None."""
+        lines = [
+            'tell application "System Events"',
+            f'tell application process "{app_process}"',
+            f"if not (exists {locator}) then return {{|exists|:false}}",
+            "set _values to {|exists|:true}",
+        ]
+        for attribute in attributes:
+            lines += [
+                "try",
+                f'set _values to _values & {{|{attribute}|:value of attribute "{attribute}" of '
+                f"{locator}}}",
+                "on error",
+                f"set _values to _values & {{|{attribute}|:missing value}}",
+                "end try",
+            ]
+        lines += ["return _values", "end tell", "end tell"]
+        values = self.execute("\n".join(lines))
+        if not values.pop("exists"):
+            return None
+        missing = AEType(aeobjects.cMissingValue)
+        return {
+            name: None if values.get(name) == missing else values.get(name) for name in attributes
+        }
+
+    def tell_app(
+        self, app: str, command: str, ignoring_responses: bool = False, args: Sequence = ()
+    ):
         _tell_what = (
             f'tell application "{app}" to {command}'
             if not ignoring_responses
             else f'ignoring application responses\ntell application "{app}" '
             f"to {command}\nend ignoring"
         )
-        return self.execute(_tell_what)
+        return self.__tell(_tell_what, args)
 
-    def tell_sys_events(self, command: str):
-        return self.execute(f'tell application "System Events" to {command}')
+    def tell_sys_events(self, command: str, args: Sequence = ()):
+        return self.__tell(f'tell application "System Events" to {command}', args)
 
-    @staticmethod
-    def execute(cmd: str):
+    def __tell(self, statement: str, args: Sequence):
+        """Execute the `statement`. With `args` it refers to them as `arg1`, `arg2`...
+        and runs as a handler of a `ScriptLibrary`, compiled once for any argument values."""
+        if not args:
+            return self.execute(statement)
+        self.flush()
+        params = ", ".join(f"arg{i}" for i in range(1, len(args) + 1))
+        source = f"on run_statement({params})\n{statement}\nend run_statement"
+        return self.libraries.get(source).call("run_statement", *args)
+
+    @_SharedMethod
+    def execute(self, cmd: str):
         """Execute AppleScript command abd returns exitcode, stdout and stderr.
+        The compiled script is kept in `script_cache` for the next call with the same source.
         :param str cmd: apple script
         :return: exitcode, stdout and stderr"""
-        result, error = NSAppleScript.alloc().initWithSource_(cmd).executeAndReturnError_(None)
+        self.flush()
+        script = self.script_cache.get(cmd)
+        with _script_lock:
+            result, error = script.executeAndReturnError_(None)
         if error:
             raise AppleScriptError(error)
         return ae_converter.unpack(result)
 
+    @staticmethod
+    def compile(source: str) -> NSAppleScript:
+        with _script_lock:
+            script = NSAppleScript.alloc().initWithSource_(source)
+            compiled, error = script.compileAndReturnError_(None)
+        if not compiled:
+            raise AppleScriptError(error)
+        return script
+
 
 as_wrapper = AppleScriptWrapper()
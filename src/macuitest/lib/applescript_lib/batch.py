@@ -0,0 +1,121 @@
+"""Queue AppleScript statements and run them as a single script."""
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from macuitest.lib.elements.controllers.input_events import input_events
+
+
+@dataclass
+class BatchedCommand:
+    """A statement queued inside `AppleScriptWrapper.batch`."""
+
+    statement: str
+    args: tuple = ()
+    origin: str = ""  # `module:function:line` of the code that issued the command.
+    error: Optional[Exception] = None  # Set once the batch has run, if the statement failed.
+
+
+class CommandBatch:
+    """Statements waiting to be run."""
+
+    def __init__(self):
+        self.commands: List[BatchedCommand] = list()
+
+    def __len__(self):
+        return len(self.commands)
+
+    def add(self, statement: str, args: Sequence = ()) -> BatchedCommand:
+        command = BatchedCommand(statement, tuple(args), _origin())
+        self.commands.append(command)
+        return command
+
+    def take(self) -> List[BatchedCommand]:
+        commands, self.commands = self.commands, list()
+        return commands
+
+
+class CommandQueue:
+    """The batch of the current thread, see `AppleScriptWrapper.batch`.
+    :param runner: Runs the commands as one script, returns `(index, message, number)`
+                   of every failed one, indexes start at 1.
+    :param error: Makes the error of a failed command from its message and number.
+    :param batch_error: Makes the error raised for the failed commands."""
+
+    def __init__(
+        self,
+        runner: Callable[[List[BatchedCommand]], Sequence[Tuple[int, str, int]]],
+        error: Callable[[str, int], Exception],
+        batch_error: Callable[[List[BatchedCommand]], Exception],
+    ):
+        self.__runner = runner
+        self.__error = error
+        self.__batch_error = batch_error
+        self.__local = threading.local()
+        input_events.add_hook(self.flush)  # Input must not overtake the commands queued before.
+
+    @property
+    def is_batching(self) -> bool:
+        return getattr(self.__local, "batch", None) is not None
+
+    @contextmanager
+    def batch(self):
+        if self.is_batching:
+            yield self.__local.batch
+            return
+        self.__local.batch = CommandBatch()
+        try:
+            yield self.__local.batch
+        finally:
+            batch, self.__local.batch = self.__local.batch, None
+        self.__run(batch.take())
+
+    def add(self, statement: str, args: Sequence = ()) -> BatchedCommand:
+        return self.__local.batch.add(statement, args)
+
+    def flush(self) -> None:
+        if self.is_batching and len(self.__local.batch):
+            self.__run(self.__local.batch.take())
+
+    def __run(self, commands: List[BatchedCommand]) -> None:
+        if not commands:
+            return
+        for index, message, number in self.__runner(commands):
+            commands[index - 1].error = self.__error(message, number)
+        failures = [command for command in commands if command.error is not None]
+        if failures:
+            raise self.__batch_error(failures)
+
+
+def batch_script(commands: Sequence[BatchedCommand]) -> str:
+    """A `run_batch(_args)` handler running every statement in its own `try` block.
+    `_args` holds the argument list of each statement, bound to its `arg1`, `arg2`...
+    The handler returns `{index, message, number}` of every failed statement."""
+    lines = ["on run_batch(_args)", "set _errors to {}"]
+    for index, command in enumerate(commands, 1):
+        lines.append("try")
+        if command.args:
+            params = ", ".join(f"arg{i}" for i in range(1, len(command.args) + 1))
+            lines.append(f"set {{{params}}} to item {index} of _args")
+        lines += [
+            command.statement,
+            "on error _message number _number",
+            f"set end of _errors to {{{index}, _message, _number}}",
+            "end try",
+        ]
+    lines += ["return _errors", "end run_batch"]
+    return "\n".join(lines)
+
+
+def _origin() -> str:
+    """`module:function:line` of the closest caller outside of the library."""
+    frame = sys._getframe(1)
+    while frame.f_back is not None and frame.f_globals.get("__name__", "").startswith("macuitest."):
+        frame = frame.f_back
+    return f"{frame.f_globals.get('__name__')}:{frame.f_code.co_name}:{frame.f_lineno}"
@@ -0,0 +1,79 @@
+"""LRU of compiled AppleScript objects keyed by their source text."""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+
+
+@dataclass
+class ScriptCacheStats:
+    """Compiled script cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    compile_time: float = 0.0  # Seconds spent compiling on cache misses.
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+    @property
+    def saved_time(self) -> float:
+        """Estimated compile time saved by the cache hits, in seconds."""
+        return self.hits * self.compile_time / self.misses if self.misses else 0.0
+
+
+class ScriptCache:
+    """Keep up to `max_size` scripts compiled by `compiler`, holding at most `max_source`
+    characters of source text. The least recently used scripts are dropped first,
+    scripts that fail to compile are never kept."""
+
+    def __init__(
+        self, compiler: Callable[[str], Any], max_size: int = 256, max_source: int = 1 << 20
+    ):
+        self.max_size = max_size
+        self.max_source = max_source
+        self.stats = ScriptCacheStats()
+        self.__compile = compiler
+        self.__scripts: "OrderedDict[str, Any]" = OrderedDict()
+        self.__source_size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__scripts)
+
+    def __contains__(self, source: str):
+        return source in self.__scripts
+
+    def get(self, source: str) -> Any:
+        """Return the compiled `source`, compiling it on a miss."""
+        with self.__lock:
+            script = self.__scripts.get(source)
+            if script is not None:
+                self.__scripts.move_to_end(source)
+                self.stats.hits += 1
+                return script
+        started = time.perf_counter()
+        script = self.__compile(source)
+        with self.__lock:
+            self.stats.compile_time += time.perf_counter() - started
+            self.stats.misses += 1
+            if source not in self.__scripts and len(source) <= self.max_source:
+                self.__scripts[source] = script
+                self.__source_size += len(source)
+                self.__evict()
+        return script
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__scripts.clear()
+            self.__source_size = 0
+
+    def __evict(self) -> None:
+        while len(self.__scripts) > self.max_size or self.__source_size > self.max_source:
+            source, _ = self.__scripts.popitem(last=False)
+            self.__source_size -= len(source)
+            self.stats.evictions += 1
@@ -3,6 +3,7 @@ import os
 import time
 from typing import Dict
 from typing import List
+from typing import Sequence
 from typing import Union
 
 from macuitest.lib.applescript_lib.applescript_wrapper import AppleScriptError
@@ -88,21 +89,20 @@ class Application:
         return macos.service_manager.wait_process_appeared(self.name, timeout=20)
 
     def set_frontmost(self, value: bool = True):
-        converted = {True: "true", False: "false"}.get(value)
-        self._set_attribute("AXFrontmost", converted)
+        self._set_attribute("AXFrontmost", bool(value))
 
     def is_frontmost(self) -> bool:
         return wait_condition(lambda: self._read_attribute("AXFrontmost"), timeout=5)
 
     def set_hidden(self, value: bool = True):
-        converted = {True: "true", False: "false"}.get(value)
-        self._set_attribute("AXHidden", converted)
+        self._set_attribute("AXHidden", bool(value))
 
     def is_hidden(self) -> bool:
         return wait_condition(lambda: self._read_attribute("AXHidden"), timeout=3)
 
     def _set_attribute(self, attribute, value):
-        return self.__execute(f'set value of attribute "{attribute}"', params=f"to {value}")
+        command = "set value of attribute arg1"
+        return self.__execute(command, params="to arg2", args=(attribute, value))
 
     def _read_attribute(self, attribute):
         try:
@@ -110,13 +110,14 @@ class Application:
         except AppleScriptError:
             return None
 
-    def __execute(self, command, params=""):
+    def __execute(self, command, params="", args: Sequence = ()):
         """Execute a command.
         :param str command: The name of the command to _execute as a string.
         :param str params: Command parameters.
+        :param args: Values `params` refer to as `arg1`, `arg2`..., passed to the script as is.
         :return str: Execution output."""
         _command = f"{command} {params}" if params else f"{command}"
-        return as_wrapper.tell_app_process(command=_command, app_process=self.name)
+        return as_wrapper.tell_app_process(command=_command, app_process=self.name, args=args)
 
     hidden = property(is_hidden, set_hidden)
     frontmost = property(is_frontmost, set_frontmost)
@@ -61,15 +61,15 @@ class Safari(Application):
         )
 
     def execute_js_command(self, command: str):
-        command = command.replace('"', '\\"')
-        tell_what = f'tell front document to do JavaScript "{command}"'
         try:
-            return as_wrapper.tell_app(self.name, tell_what)
+            return as_wrapper.tell_app(
+                self.name, "tell front document to do JavaScript arg1", args=(command,)
+            )
         except AppleScriptError:
-            logging.warning(f'Could not execute: "{tell_what}"')
+            logging.warning(f'Could not execute: "{command}"')
 
     def search_web(self, query: str) -> None:
-        as_wrapper.tell_app(self.name, f'tell front tab to search the web for "{query}"')
+        as_wrapper.tell_app(self.name, "tell front tab to search the web for arg1", args=(query,))
 
     def confirm_download(self) -> None:
         time.sleep(0.5)
@@ -1,8 +1,12 @@
 """Some basic functions to be used throughout the project."""
 import functools
+import sys
 import time
+from dataclasses import dataclass
+from types import FrameType
 from typing import Any
 from typing import Callable
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -11,24 +15,139 @@ class WaitConditionException(Exception):
     """A `placeholder` exception for `wait_condition`."""
 
 
+class PollStrategy:
+    """Decides how long `wait_condition` sleeps between two predicate calls."""
+
+    def delay(self, attempt: int, cost: float) -> float:
+        """Return the pause after the `attempt`-th call that took `cost` seconds."""
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class FixedInterval(PollStrategy):
+    """Sleep the same `interval` between the calls."""
+
+    interval: float = 0.005
+
+    def delay(self, attempt: int, cost: float) -> float:
+        return self.interval
+
+
+@dataclass(frozen=True)
+class ExponentialBackoff(PollStrategy):
+    """Start polling fast and slow down by `factor` after every call up to `maximum`,
+    suits conditions that are either met right away or take a while (app launches)."""
+
+    initial: float = 0.005
+    factor: float = 2.0
+    maximum: float = 0.5
+
+    def delay(self, attempt: int, cost: float) -> float:
+        return min(self.initial * self.factor ** (attempt - 1), self.maximum)
+
+
+@dataclass(frozen=True)
+class CostProportional(PollStrategy):
+    """Sleep `ratio` times as long as the last call took, so that expensive predicates
+    (screen captures, AppleScript round trips) do not run back-to-back."""
+
+    ratio: float = 1.0
+    minimum: float = 0.005
+    maximum: float = 1.0
+
+    def delay(self, attempt: int, cost: float) -> float:
+        return min(max(cost * self.ratio, self.minimum), self.maximum)
+
+
+@dataclass
+class WaitStats:
+    """What a `wait_condition` call took, filled in when passed as `stats`."""
+
+    attempts: int = 0
+    exceptions: int = 0  # Swallowed exceptions.
+    predicate_time: float = 0.0  # Seconds spent in the predicate.
+    elapsed: float = 0.0
+    succeeded: bool = False
+
+    @property
+    def time_to_success(self) -> Optional[float]:
+        return self.elapsed if self.succeeded else None
+
+
+default_poll_strategy: PollStrategy = FixedInterval()
+wait_recorder = None  # A `WaitRecorder` while one is started.
+
+
 def wait_condition(
     predicate: Callable,
     timeout: Union[int, float] = 10,
     exceptions: tuple = (WaitConditionException,),
     *args,
+    poll_strategy: Optional[PollStrategy] = None,
+    wait_stats: Optional[WaitStats] = None,
+    wait_label: Optional[str] = None,
     **kwargs,
 ) -> Any:
-    """Execute `predicate` and return the result."""
-    end = time.time() + timeout
-    while time.time() < end:
-        time.sleep(0.005)
-        try:
-            result = predicate(*args, **kwargs)
-            if result:
-                return result
-        except exceptions:
-            continue
-    return False
+    """Execute `predicate` until it returns a truthy result or `timeout` seconds pass.
+    The predicate is called once more right at the deadline, whatever the polling strategy;
+    with a `timeout` of 0 or less it is not called at all. Other keyword arguments go to
+    the predicate.
+    :param poll_strategy: Polling strategy, `default_poll_strategy` if not given.
+    :param wait_stats: `WaitStats` to record the attempts into.
+    :param wait_label: Name of the wait for the `WaitRecorder`, the calling code location
+                       by default.
+    :return: The predicate result or False on timeout."""
+    stats = wait_stats if wait_stats is not None else WaitStats()
+    poll = poll_strategy or default_poll_strategy
+    result = False
+    if timeout > 0:
+        result = _poll(predicate, timeout, exceptions, poll, stats, args, kwargs)
+    if wait_recorder is not None:
+        wait_recorder.record(wait_label or call_site(sys._getframe(1)), timeout, stats)
+    return result
+
+
+def _poll(predicate, timeout, exceptions, poll: PollStrategy, stats: WaitStats, args, kwargs):
+    started = time.monotonic()
+    deadline = started + timeout
+    while True:
+        spent = stats.predicate_time
+        result, finished = _attempt(predicate, exceptions, stats, args, kwargs)
+        stats.elapsed = finished - started
+        if result:
+            stats.succeeded = True
+            return result
+        if finished >= deadline:
+            return False
+        delay = poll.delay(stats.attempts, stats.predicate_time - spent)
+        time.sleep(min(delay, deadline - finished))
+
+
+def call_site(frame: FrameType) -> str:
+    """`module:function:line` of the closest code outside of the library that led to `frame`,
+    followed by the library function it went through, e.g. `tests.login:test_login:12 via
+    macuitest.lib.elements.ui_element:wait_displayed`."""
+    library = None
+    while frame.f_back is not None and frame.f_globals.get("__name__", "").startswith("macuitest."):
+        library, frame = frame, frame.f_back
+    site = f"{frame.f_globals.get('__name__')}:{frame.f_code.co_name}:{frame.f_lineno}"
+    if library is None:
+        return site
+    return f"{site} via {library.f_globals.get('__name__')}:{library.f_code.co_name}"
+
+
+def _attempt(predicate: Callable, exceptions: tuple, stats: WaitStats, args, kwargs):
+    """Call the predicate once, return its result (None if it raised) and the finish time."""
+    started = time.monotonic()
+    stats.attempts += 1
+    try:
+        result = predicate(*args, **kwargs)
+    except exceptions:
+        stats.exceptions += 1
+        result = None
+    finished = time.monotonic()
+    stats.predicate_time += finished - started
+    return result, finished
 
 
 def _parametrized(decorator):
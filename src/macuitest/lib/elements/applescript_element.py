@@ -4,26 +4,35 @@ from dataclasses import dataclass
 from datetime import datetime
 from types import MappingProxyType
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
+from macuitest.config.colors import CSS3_COLORS
 from macuitest.config.constants import CheckboxState
 from macuitest.config.constants import DisclosureTriangleState
 from macuitest.config.constants import Frame
 from macuitest.config.constants import Point
 from macuitest.config.constants import Region
+from macuitest.lib import aio
 from macuitest.lib import core
 from macuitest.lib.applescript_lib.applescript_wrapper import AppleScriptError
 from macuitest.lib.applescript_lib.applescript_wrapper import as_wrapper
 from macuitest.lib.core import is_close
 from macuitest.lib.core import wait_condition
 from macuitest.lib.elements.controllers.keyboard_controller import keyboard
-from macuitest.lib.elements.controllers.mouse import MouseConfig
 from macuitest.lib.elements.controllers.mouse import mouse
+from macuitest.lib.elements.controllers.pacing import pacing
+from macuitest.lib.elements.existence_cache import existence_cache
 from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.elements.ui_tree import ATTRIBUTES
+from macuitest.lib.elements.ui_tree import UINode
+from macuitest.lib.elements.ui_tree import snapshot_tree
 from macuitest.lib.operating_system.color_meter import get_color
+from macuitest.lib.operating_system.color_meter import get_dominant_colors
 from macuitest.lib.operating_system.color_meter import get_most_common_color
 from macuitest.lib.operating_system.env import env
 
@@ -70,19 +79,35 @@ class BaseUIElement:
         f = self.frame
         return Region(f.x1 - margin, f.y1 - margin, f.x2 + margin, f.y2 + margin)
 
-    def most_common_color(self, ignore_colors: Optional[Tuple[str, ...]] = None):
+    def most_common_color(
+        self,
+        ignore_colors: Optional[Tuple[str, ...]] = None,
+        palette: Sequence = CSS3_COLORS,
+        engine: str = "rgb",
+    ):
+        f = self.frame
+        return get_most_common_color(f.x1, f.y1, f.x2, f.y2, ignore_colors, palette, engine)
+
+    def dominant_colors(
+        self,
+        count: int = 3,
+        ignore_colors: Optional[Tuple[str, ...]] = None,
+        palette: Sequence = CSS3_COLORS,
+    ) -> List[Tuple[str, float]]:
         f = self.frame
-        return get_most_common_color(f.x1, f.x2, f.y1, f.y2, ignore_colors)
+        return get_dominant_colors(f.x1, f.y1, f.x2, f.y2, count, ignore_colors, palette)
 
-    def color(self, x_off: int = 0, y_off: int = 0) -> str:
+    def color(
+        self, x_off: int = 0, y_off: int = 0, palette: Sequence = CSS3_COLORS, engine: str = "rgb"
+    ) -> str:
         c = self.frame.center
-        return get_color(Point(c.x + x_off, c.y + y_off)).replace("gray", "grey")
+        return get_color(Point(c.x + x_off, c.y + y_off), palette, engine).replace("gray", "grey")
 
     def scroll(self, x_off: int = 0, y_off: int = 0, clicks: int = 1):
         c = self.frame.center
         mouse.scroll(c.x + x_off, c.y + y_off, scrolls=clicks)
 
-    def doubleclick_mouse(self, x_off: int = 0, y_off: int = 0, duration: float = MouseConfig.move):
+    def doubleclick_mouse(self, x_off: int = 0, y_off: int = 0, duration: Optional[float] = None):
         c = self.frame.center
         mouse.double_click(c.x + x_off, c.y + y_off, duration=duration)
 
@@ -90,9 +115,9 @@ class BaseUIElement:
         self,
         x_off: int = 0,
         y_off: int = 0,
-        hold: float = MouseConfig.hold,
-        duration: float = MouseConfig.move,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        duration: Optional[float] = None,
+        pause: Optional[float] = None,
     ) -> None:
         c = self.frame.center
         mouse.right_click(c.x + x_off, c.y + y_off, hold, duration, pause)
@@ -101,54 +126,52 @@ class BaseUIElement:
         self,
         x_off: int = 0,
         y_off: int = 0,
-        hold: float = MouseConfig.hold,
-        duration: float = MouseConfig.move,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        duration: Optional[float] = None,
+        pause: Optional[float] = None,
     ) -> None:
         c = self.frame.center
         mouse.click(c.x + x_off, c.y + y_off, hold, duration, pause)
 
-    def hover_mouse(
-        self, x_off: int = 0, y_off: int = 0, duration: float = MouseConfig.move
-    ) -> None:
+    def hover_mouse(self, x_off: int = 0, y_off: int = 0, duration: Optional[float] = None) -> None:
         c = self.frame.center
         mouse.hover(c.x + x_off, c.y + y_off, duration=duration)
 
     @property
     def frame(self) -> Frame:
-        self.__assert_visible()
-        _frame = (*self.get_attribute_value("AXPosition"), *self.get_attribute_value("AXSize"))
+        values = self.read_attributes(("AXPosition", "AXSize"))
+        _frame = (*values["AXPosition"], *values["AXSize"])
         x1, y1, width, height = (math.floor(x) for x in _frame)
         x2, y2 = x1 + width, y1 + height
         center = Point(int((x1 + width / 2)), int((y1 + height / 2)))
         return Frame(x1, y1, x2, y2, center, width, height)
 
-    def click(self, pause: float = 0.4) -> bool:
+    def click(self, pause: Optional[float] = None) -> bool:
         """Perform click action the element."""
+        if as_wrapper.is_batching:
+            self._command("click")
+            return True
         self.__assert_visible()
-        time.sleep(pause)
-        self._execute("click")
-        time.sleep(0.25)
+        pacing.sleep("element_pause", pause)
+        self._execute("click", queue=True)
+        pacing.sleep("after_action")
+        pacing.settle()
         return True
 
     def _select(self):
         """Click an element."""
-        self.__assert_visible()
-        return self._execute("select")
+        return self._command("select")
 
     def _set_focus(self, value):
         """Make element focused."""
-        self.__assert_visible()
-        return self._execute("set focused of", params=f'to "{value}"')
+        return self._command("set focused of", params="to arg1", args=(value,))
 
     def _show_context_menu(self):
-        self.__assert_visible()
-        return self._execute('perform action "AXShowMenu" of')
+        return self._command('perform action "AXShowMenu" of')
 
     def _set_value(self, value):
         """Set element value."""
-        self.__assert_visible()
-        return self._execute("set value of", params=f'to "{value}"')
+        return self._command("set value of", params="to arg1", args=(value,))
 
     def _get_value(self):
         """Get element value."""
@@ -162,8 +185,7 @@ class BaseUIElement:
 
     @property
     def _children(self):
-        self.__assert_visible()
-        return self.get_attribute_value("AXChildren")
+        return self.read_attributes(("AXChildren",))["AXChildren"]
 
     @property
     def _rows(self) -> int:
@@ -172,33 +194,27 @@ class BaseUIElement:
 
     @property
     def title(self) -> str:
-        self.__assert_visible()
-        return self.get_attribute_value("AXTitle").strip()
+        return self.read_attributes(("AXTitle",))["AXTitle"].strip()
 
     @property
     def description(self) -> str:
-        self.__assert_visible()
-        return self.get_attribute_value("AXDescription").strip()
+        return self.read_attributes(("AXDescription",))["AXDescription"].strip()
 
     @property
     def value(self) -> str:
-        self.__assert_visible()
-        return self.get_attribute_value("AXValue")
+        return self.read_attributes(("AXValue",))["AXValue"]
 
     @property
     def help(self) -> str:
-        self.__assert_visible()
-        return self.get_attribute_value("AXHelp")
+        return self.read_attributes(("AXHelp",))["AXHelp"]
 
     @property
     def _placeholder(self) -> str:
-        self.__assert_visible()
-        return self.get_attribute_value("AXPlaceholderValue")
+        return self.read_attributes(("AXPlaceholderValue",))["AXPlaceholderValue"]
 
     def _is_enabled(self) -> bool:
         """Check whether element enabled"""
-        self.__assert_visible()
-        return self.get_attribute_value("AXEnabled")
+        return self.read_attributes(("AXEnabled",))["AXEnabled"]
 
     @property
     def did_vanish(self) -> bool:
@@ -215,8 +231,19 @@ class BaseUIElement:
     def wait_displayed(self, timeout: Union[int, float] = 5):
         return wait_condition(self.is_exists, timeout=timeout)
 
+    async def wait_displayed_async(self, timeout: Union[int, float] = 5):
+        return await aio.wait_condition(
+            self.is_exists, timeout=timeout, executor=aio.applescript_executor
+        )
+
+    async def wait_vanish_async(self, timeout: Union[int, float] = 5) -> bool:
+        await self.wait_displayed_async(timeout=0.3)
+        return await aio.wait_condition(
+            lambda: self.is_exists() is False, timeout=timeout, executor=aio.applescript_executor
+        )
+
     def perform_action(self, action):
-        self._execute(f'perform action "{action}" of')
+        self._execute(f'perform action "{action}" of', queue=True)
 
     @property
     def actions(self) -> List[str]:
@@ -226,7 +253,40 @@ class BaseUIElement:
             return []
 
     def _set_attribute(self, attribute, value) -> Any:
-        return self._execute(f'set value of attribute "{attribute}" of', params=f"to {value}")
+        command = "set value of attribute arg1 of"
+        return self._execute(command, params="to arg2", args=(attribute, value), queue=True)
+
+    def read_attributes(
+        self, attributes: Sequence[str], timeout: Union[int, float] = 5
+    ) -> Dict[str, Any]:
+        """Wait for the element to be displayed and read its `attributes` in one AppleScript call,
+        e.g. `read_attributes(("AXPosition", "AXSize"))`. Missing attributes read as None.
+        :raise LookupError: If the element is not displayed within `timeout` seconds."""
+        read = wait_condition(lambda: self.__read_attributes(attributes), timeout=timeout)
+        if read is False:
+            raise LookupError(self)
+        return read[0]
+
+    def __read_attributes(self, attributes: Sequence[str]) -> Optional[Tuple[Dict[str, Any]]]:
+        """The attribute values wrapped in a tuple, so that an empty read is still truthy;
+        None if the element does not exist."""
+        try:
+            values = as_wrapper.read_attributes(self.locator, self.process, attributes)
+        except AppleScriptError as e:
+            if e.number != -10000:
+                raise
+            return None
+        existence_cache.put(self.locator, self.process, values is not None)
+        return None if values is None else (values,)
+
+    def snapshot_tree(self, attributes: Sequence[str] = ATTRIBUTES, depth: int = 3) -> UINode:
+        """Snapshot the element and its descendants `depth` levels down in one AppleScript call,
+        see `ui_tree.snapshot_tree`.
+        :raise LookupError: If the element does not exist."""
+        tree = snapshot_tree(self.locator, self.process, attributes, depth)
+        if tree is None:
+            raise LookupError(self)
+        return tree
 
     def get_attribute_value(self, attribute) -> Any:
         try:
@@ -242,25 +302,42 @@ class BaseUIElement:
             return []
 
     def is_exists(self) -> bool:
+        exists = existence_cache.get(self.locator, self.process)
+        if exists is not None:
+            return exists
         try:
-            return self._execute("return exists")
+            exists = self._execute("return exists")
         except AppleScriptError as e:
             if e.number == -10000:
-                pass
-            else:
-                raise
+                return None
+            raise
+        existence_cache.put(self.locator, self.process, exists)
+        return exists
 
     def __assert_visible(self):
         if not self.is_visible:
             raise LookupError(self)
 
-    def _execute(self, command: str, params: str = ""):
+    def _command(self, command: str, params: str = "", args: Sequence = ()):
+        """Execute an action on the element once it is displayed. Inside `as_wrapper.batch()`
+        the action is queued without waiting for the element, see `_execute` for arguments."""
+        if not as_wrapper.is_batching:
+            self.__assert_visible()
+        return self._execute(command, params, args, queue=True)
+
+    def _execute(self, command: str, params: str = "", args: Sequence = (), queue: bool = False):
         """Execute a command.
         :param str command: The name of the command to _execute as a string.
         :param str params: Command parameters.
+        :param args: Values `params` refer to as `arg1`, `arg2`..., passed to the script as is.
+        :param queue: Queue the command inside `as_wrapper.batch()`.
         :return str: Execution output."""
         _command = f"{command} {self.locator} {params}" if params else f"{command} {self.locator}"
-        return as_wrapper.tell_app_process(command=_command, app_process=self.process)
+        try:
+            return as_wrapper.tell_app_process(_command, self.process, args=args, queue=queue)
+        finally:
+            if queue:  # An action, the UI is about to change.
+                existence_cache.invalidate()
 
 
 class Button(BaseUIElement):
@@ -332,7 +409,7 @@ class TextField(TextElement):
         for _ in range(2):
             self.text = ""
             self.focus()
-            time.sleep(0.5)
+            pacing.sleep("focus")
             keyboard.write(with_text, pause=pause)
             if wait_condition(lambda: len(self.text) == len(with_text), timeout=0.5):
                 break
@@ -376,7 +453,7 @@ class ComboBox(BaseUIElement):
 
     def set_value(self, value):
         self.wait_displayed()
-        time.sleep(0.5)
+        pacing.sleep("focus")
         self._set_value(value)
 
     text = property(value, set_value)
@@ -444,9 +521,11 @@ class Group(BaseUIElement):
 
 
 class Row(BaseUIElement):
-    def select(self, pause: float = 0.3):
+    def select(self, pause: Optional[float] = None):
         self._select()
-        time.sleep(pause)
+        if not as_wrapper.is_batching:
+            pacing.sleep("after_select", pause)
+            pacing.settle()
 
     @property
     def is_selected(self) -> bool:
@@ -494,27 +573,25 @@ class Window(BaseUIElement):
         super().__init__(locator, process)
 
     def set_position(self, point: Tuple[int, int]):
-        self._execute("set position of", params="to {%s, %s}" % (point[0], point[1]))
+        self._execute("set position of", "to {arg1, arg2}", tuple(point[:2]), queue=True)
 
     def get_position(self) -> Tuple[int, int]:
         return tuple(self._execute("get position of"))
 
     def set_size(self, size: Tuple[int, int]):
-        self._execute("set size of", params="to {%s, %s}" % (size[0], size[1]))
+        self._execute("set size of", "to {arg1, arg2}", tuple(size[:2]), queue=True)
 
     def get_size(self) -> Tuple[int, int]:
         return tuple(self._execute("get size of"))
 
     def set_minimized(self, value):
-        converted = {True: "true", False: "false"}.get(value)
-        self._set_attribute("AXMinimized", converted)
+        self._set_attribute("AXMinimized", bool(value))
 
     def is_minimized(self):
         return self.get_attribute_value("AXMinimized")
 
     def set_full_screen(self, value):
-        converted = {True: "true", False: "false"}.get(value)
-        self._set_attribute("AXFrontmost", converted)
+        self._set_attribute("AXFrontmost", bool(value))
 
     def is_full_screen(self):
         return self.get_attribute_value("AXFullScreen")
@@ -0,0 +1,41 @@
+from typing import Callable
+from typing import List
+
+
+class InputEvents:
+    """Notify subscribers that a synthesized mouse or keyboard event has been posted.
+    Used to drop data that might be stale after user input, e.g. cached screen snapshots.
+    Pre-post hooks run right before an event is posted, e.g. to run queued commands first."""
+
+    def __init__(self):
+        self.__subscribers: List[Callable[[], None]] = list()
+        self.__hooks: List[Callable[[], None]] = list()
+
+    def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
+        if callback not in self.__subscribers:
+            self.__subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def notify(self) -> None:
+        for callback in tuple(self.__subscribers):
+            callback()
+
+    def add_hook(self, callback: Callable[[], None]) -> Callable[[], None]:
+        if callback not in self.__hooks:
+            self.__hooks.append(callback)
+        return callback
+
+    def remove_hook(self, callback: Callable[[], None]) -> None:
+        if callback in self.__hooks:
+            self.__hooks.remove(callback)
+
+    def before_post(self) -> None:
+        for callback in tuple(self.__hooks):
+            callback()
+
+
+input_events = InputEvents()
@@ -3,8 +3,10 @@ import time
 import AppKit
 import Quartz
 
+from macuitest.lib.elements.controllers.input_events import input_events
 from macuitest.lib.elements.controllers.keyboard_mappings import KEYBOARD_KEYS
 from macuitest.lib.elements.controllers.keyboard_mappings import SPECIAL_KEYS
+from macuitest.lib.elements.controllers.pacing import pacing
 
 
 class KeyBoardController:
@@ -25,12 +27,13 @@ class KeyBoardController:
             if len(c) > 1:
                 c = c.lower()
             self.__send_key_event(c, "down")
-            time.sleep(0.025)
+            pacing.sleep("key")
         for c in reversed(args):
             if len(c) > 1:
                 c = c.lower()
             self.__send_key_event(c, "up")
-            time.sleep(0.025)
+            pacing.sleep("key")
+        pacing.settle()
 
     def __send_key_event(self, key: str, event: str):
         send = self.send_special_key_event if key in SPECIAL_KEYS else self.send_regular_key_event
@@ -39,17 +42,19 @@ class KeyBoardController:
     def send_regular_key_event(self, key: str, event_type):
         if KEYBOARD_KEYS.get(key) is None:
             raise ValueError(f'Key "{key}" is not available')
+        input_events.before_post()
         if self.is_shift_char(key):
             key_code = KEYBOARD_KEYS[key.lower()]
             event = Quartz.CGEventCreateKeyboardEvent(
                 None, KEYBOARD_KEYS["shift"], event_type == "down"
             )
             Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
-            time.sleep(0.03)  # Tiny sleep to let OS X catch up on us pressing shift
+            pacing.sleep("shift")  # Tiny sleep to let OS X catch up on us pressing shift
         else:
             key_code = KEYBOARD_KEYS[key]
         event = Quartz.CGEventCreateKeyboardEvent(None, key_code, event_type == "down")
         Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+        input_events.notify()
 
     @staticmethod
     def send_special_key_event(key, event_type):
@@ -66,7 +71,9 @@ class KeyBoardController:
             (key_code << 16) | ((0xA if event_type == "down" else 0xB) << 8),  # data1
             -1,  # data2
         )
+        input_events.before_post()
         Quartz.CGEventPost(0, ev.CGEvent())
+        input_events.notify()
 
     @staticmethod
     def is_shift_char(character: str):
@@ -1,18 +1,32 @@
-import time
 from dataclasses import dataclass
+from typing import Optional
 
 from macuitest.lib.elements.controllers.keyboard_controller import keyboard
 from macuitest.lib.elements.controllers.mouse_controller import MouseController
+from macuitest.lib.elements.controllers.pacing import pacing
+
+
+def _profile_delay(name: str) -> property:
+    return property(lambda _: getattr(pacing.profile, name), doc=f"`pacing.profile.{name}`.")
+
+
+class _MouseConfigType(type):
+    """Serve the delays on the class as well, e.g. `MouseConfig.hold`."""
+
+    move = _profile_delay("move")
+    hold = _profile_delay("hold")
+    pause = _profile_delay("pause")
 
 
 @dataclass(frozen=True)
-class MouseConfig:
-    """Mouse options."""
+class MouseConfig(metaclass=_MouseConfigType):
+    """Mouse options. The `move`, `hold` and `pause` delays are read-only, they come from
+    `pacing.profile`; set them with `pacing.use`."""
 
-    move: float = 0.18  # Cursor roaming time.
-    hold: float = 0.24  # Time to hold a button selected.
-    pause: float = 0.24  # Pause after an action.
     default_position: tuple = (5, 3)
+    move = _profile_delay("move")
+    hold = _profile_delay("hold")
+    pause = _profile_delay("pause")
 
 
 class Mouse:
@@ -27,46 +41,48 @@ class Mouse:
         keyboard.write(phrase, pause=0.02)
 
     def double_click(
-        self, x: int, y: int, _x: int = 0, _y: int = 0, duration: float = MouseConfig.move
+        self, x: int, y: int, _x: int = 0, _y: int = 0, duration: Optional[float] = None
     ) -> None:
         """Hover over position and click twice."""
         self.hover(x, y, duration=duration)
         self.controller.multi_click(x, y, button="left", clicks=2)
+        pacing.settle((x, y))
 
     def drag(self, x1: int, y1: int, x2: int, y2: int) -> None:
         self.hover(x1, y1)
         self.controller.mouse_down(x1, y1, "left")
-        time.sleep(0.5)
-        self.controller.drag_to(x2, y2)
-        time.sleep(0.5)
+        pacing.sleep("drag_hold")
+        self.controller.drag_to(x2, y2, duration=pacing.delay("drag"))
+        pacing.sleep("drag_hold")
         self.controller.mouse_up(x2, y2, "left")
-        time.sleep(0.25)
+        pacing.sleep("after_press")
+        pacing.settle((x2, y2))
 
     def click(
         self,
         x: int,
         y: int,
-        hold: float = MouseConfig.hold,
-        duration: float = MouseConfig.move,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        duration: Optional[float] = None,
+        pause: Optional[float] = None,
     ) -> None:
         """Hover over position and left-click once."""
-        time.sleep(pause)
+        pacing.sleep("pause", pause)
         self.hover(x, y, duration)
-        self._press_mouse_button(x, y, mouse_button="left", hold=hold, pause=0.125)
+        self._press_mouse_button(x, y, mouse_button="left", hold=hold)
 
     def right_click(
         self,
         x: int,
         y: int,
-        hold: float = MouseConfig.hold,
-        duration: float = MouseConfig.move,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        duration: Optional[float] = None,
+        pause: Optional[float] = None,
     ) -> None:
         """Hover over the position and control-click once."""
-        time.sleep(pause)
+        pacing.sleep("pause", pause)
         self.hover(x, y, duration)
-        self._press_mouse_button(x, y, mouse_button="right", hold=hold, pause=0.125)
+        self._press_mouse_button(x, y, mouse_button="right", hold=hold)
 
     def scroll(self, x: int, y: int, scrolls: int = 1) -> None:
         self.hover(x, y)
@@ -75,16 +91,19 @@ class Mouse:
     def reset(self):
         self.hover(*MouseConfig.default_position)
 
-    def hover(self, x: int, y: int, duration: float = MouseConfig.move) -> None:
+    def hover(self, x: int, y: int, duration: Optional[float] = None) -> None:
         """Hover over the position."""
-        self.controller.move_to(x, y, duration=duration)
+        self.controller.move_to(x, y, duration=pacing.delay("move", duration))
 
-    def _press_mouse_button(self, x: int, y: int, mouse_button: str, hold: float, pause: float):
-        time.sleep(pause)
+    def _press_mouse_button(
+        self, x: int, y: int, mouse_button: str, hold: Optional[float] = None
+    ) -> None:
+        pacing.sleep("before_press")
         self.controller.mouse_down(x, y, mouse_button)
-        time.sleep(hold)
+        pacing.sleep("hold", hold)
         self.controller.mouse_up(x, y, mouse_button)
-        time.sleep(0.25)  # We want to wait a bit for system to register the event.
+        pacing.sleep("after_press")  # We want to wait a bit for system to register the event.
+        pacing.settle((x, y))
 
 
 mouse = Mouse(MouseController())
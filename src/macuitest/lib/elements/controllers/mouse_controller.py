@@ -4,6 +4,9 @@ from typing import Tuple
 import AppKit
 import Quartz
 
+from macuitest.lib.elements.controllers.input_events import input_events
+from macuitest.lib.elements.controllers.pacing import pacing
+
 
 class MouseController:
     def __init__(self):
@@ -11,11 +14,11 @@ class MouseController:
 
     def move_to(self, x: int, y: int, duration: float = 0.35):
         self.__mouse_move_drag(x=x, y=y, duration=duration)
-        time.sleep(0.125)
+        pacing.sleep("after_move")
 
     def drag_to(self, x: int, y: int, duration: float = 0.35):
         self.__mouse_move_drag(x=x, y=y, duration=duration, move="drag")
-        time.sleep(0.125)
+        pacing.sleep("after_move")
 
     def mouse_down(self, x: int, y: int, button: str):
         if button == "left":
@@ -49,6 +52,8 @@ class MouseController:
         if steps_count < 50:
             duration /= 3
         pause = duration / steps_count
+        if not pause:
+            steps_count = 0  # Jump straight to the target.
         for step in (
             get_point_on_line(start_x, start_y, x, y, ease_out_quad(n / steps_count))
             for n in range(steps_count)
@@ -61,11 +66,13 @@ class MouseController:
     def vertical_scroll(scrolls: int, speed: int = 1):
         if scrolls < 0:
             speed *= -1
+        input_events.before_post()
         for _ in range(abs(scrolls)):
             swe = Quartz.CGEventCreateScrollWheelEvent(
                 None, Quartz.kCGScrollEventUnitLine, 1, speed
             )
             Quartz.CGEventPost(Quartz.kCGHIDEventTap, swe)
+            input_events.notify()
             time.sleep(0.003)
 
     @staticmethod
@@ -85,6 +92,7 @@ class MouseController:
         else:
             raise ValueError("button argument not in ('left', 'middle', 'right')")
 
+        input_events.before_post()
         mouse_event = Quartz.CGEventCreateMouseEvent(None, down, (x, y), btn)
         Quartz.CGEventSetIntegerValueField(mouse_event, Quartz.kCGMouseEventClickState, clicks)
         Quartz.CGEventPost(Quartz.kCGHIDEventTap, mouse_event)
@@ -95,6 +103,7 @@ class MouseController:
             Quartz.CGEventPost(Quartz.kCGHIDEventTap, mouse_event)
             Quartz.CGEventSetType(mouse_event, up)
             Quartz.CGEventPost(Quartz.kCGHIDEventTap, mouse_event)
+        input_events.notify()
 
     @property
     def position(self):
@@ -113,8 +122,10 @@ class MouseController:
 
     @staticmethod
     def _send_mouse_event(event, x: int, y: int, button):
+        input_events.before_post()
         event = Quartz.CGEventCreateMouseEvent(None, event, (x, y), button)
         Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+        input_events.notify()
 
 
 def ease_out_quad(n: float) -> float:
@@ -0,0 +1,212 @@
+"""Pacing of the synthesized input: the delays around mouse, keyboard and element actions.
+Every controller and element reads its delays from the active profile:
+
+    pacing.use("fast")  # For the whole session, or `MACUITEST_PACING=fast` in the environment.
+    with pacing.using("human"):
+        button.click_mouse()
+
+Profiles that cut the delays wait for the screen to settle after an action instead."""
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from macuitest.config.constants import Region
+
+
+@dataclass(frozen=True)
+class PacingProfile:
+    """Delays (seconds) of the input actions."""
+
+    name: str
+    move: float = 0.18  # Cursor roaming time.
+    hold: float = 0.24  # Time to hold a button pressed.
+    pause: float = 0.24  # Pause before a click.
+    after_move: float = 0.125  # Let the cursor rest after a move or a drag.
+    before_press: float = 0.125  # Between the cursor arrival and the button press.
+    after_press: float = 0.25  # Let the system register a click.
+    drag: float = 0.35  # Cursor roaming time with a button held.
+    drag_hold: float = 0.5  # Before and after dragging with the button held.
+    key: float = 0.025  # Between the keys of a hotkey.
+    shift: float = 0.03  # Let the system register a pressed shift.
+    element_pause: float = 0.4  # Before an element action, e.g. an accessibility press.
+    after_action: float = 0.25  # Let the system register an element action.
+    after_select: float = 0.3  # Let the system register a selected row.
+    native_pause: float = 0.375  # Before pressing a native clickable element.
+    after_native_press: float = 0.24  # Let the system register a native element press.
+    focus: float = 0.5  # Before typing into or setting the value of a focused element.
+    settle: float = 0.0  # Time the screen must stay unchanged after an action, 0 disables.
+    settle_timeout: float = 1.0  # Give up waiting for the screen to settle.
+
+
+PROFILES: Dict[str, PacingProfile] = dict(
+    human=PacingProfile(
+        "human",
+        move=0.35,
+        hold=0.3,
+        pause=0.35,
+        after_move=0.2,
+        before_press=0.15,
+        after_press=0.35,
+        drag=0.5,
+        drag_hold=0.6,
+        key=0.05,
+        shift=0.05,
+        element_pause=0.5,
+        after_action=0.35,
+        after_select=0.4,
+        native_pause=0.45,
+        after_native_press=0.35,
+        focus=0.6,
+    ),
+    default=PacingProfile("default"),
+    fast=PacingProfile(
+        "fast",
+        move=0.05,
+        hold=0.05,
+        pause=0.0,
+        after_move=0.0,
+        before_press=0.02,
+        after_press=0.0,
+        drag=0.1,
+        drag_hold=0.1,
+        key=0.01,
+        shift=0.01,
+        element_pause=0.0,
+        after_action=0.0,
+        after_select=0.0,
+        native_pause=0.0,
+        after_native_press=0.0,
+        focus=0.1,
+        settle=0.08,
+    ),
+    turbo=PacingProfile(
+        "turbo",
+        move=0.0,
+        hold=0.01,
+        pause=0.0,
+        after_move=0.0,
+        before_press=0.0,
+        after_press=0.0,
+        drag=0.0,
+        drag_hold=0.02,
+        key=0.002,
+        shift=0.002,
+        element_pause=0.0,
+        after_action=0.0,
+        after_select=0.0,
+        native_pause=0.0,
+        after_native_press=0.0,
+        focus=0.02,
+        settle=0.03,
+        settle_timeout=0.5,
+    ),
+)
+
+
+@dataclass
+class PacingStats:
+    """Delays taken from the profiles and the time spent waiting for the screen to settle."""
+
+    delays: Dict[str, int] = field(default_factory=dict)  # Uses per delay name.
+    spent: float = 0.0  # Summed profile delays.
+    settles: int = 0
+    settle_time: float = 0.0
+    unsettled: int = 0  # Settle waits that ran into their timeout.
+
+    def cost(self, profile: PacingProfile) -> float:
+        """Time the same delays would have taken under `profile`."""
+        return sum(getattr(profile, name) * count for name, count in self.delays.items())
+
+
+class Pacing:
+    """Hold the active pacing profile and count the delays it imposes.
+    Delays passed explicitly to an action are used as is and are not counted."""
+
+    settle_radius = 200  # Half size (points) of the area watched around a mouse action.
+
+    def __init__(self, profile: Union[str, PacingProfile] = "default"):
+        self.profile: PacingProfile = self.__resolve(profile)
+        self.stats = PacingStats()
+
+    def __repr__(self):
+        return f'<Pacing profile="{self.profile.name}">'
+
+    def use(self, profile: Union[str, PacingProfile], **overrides) -> PacingProfile:
+        """Switch to a profile for the rest of the session, e.g. `use("fast", key=0.02)`."""
+        self.profile = self.__resolve(profile, **overrides)
+        return self.profile
+
+    @contextmanager
+    def using(self, profile: Union[str, PacingProfile], **overrides):
+        """Switch to a profile for the duration of a `with` block."""
+        previous = self.profile
+        try:
+            yield self.use(profile, **overrides)
+        finally:
+            self.profile = previous
+
+    def delay(self, name: str, seconds: Optional[float] = None) -> float:
+        """Return the `name` delay of the active profile, unless `seconds` are given."""
+        if seconds is not None:
+            return seconds
+        seconds = getattr(self.profile, name)
+        self.stats.delays[name] = self.stats.delays.get(name, 0) + 1
+        self.stats.spent += seconds
+        return seconds
+
+    def sleep(self, name: str, seconds: Optional[float] = None) -> None:
+        seconds = self.delay(name, seconds)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def settle(self, point: Optional[Tuple[int, int]] = None) -> bool:
+        """Wait for the screen around `point` (or the whole screen) to stop changing,
+        if the active profile asks for it. :return: False if it kept changing."""
+        if not self.profile.settle:
+            return True
+        from macuitest.lib.elements.ui.settle import settle
+
+        started = time.monotonic()
+        settled = settle.wait_screen(
+            self.__area(point), quiet=self.profile.settle, timeout=self.profile.settle_timeout
+        )
+        self.stats.settles += 1
+        self.stats.settle_time += time.monotonic() - started
+        self.stats.unsettled += not settled
+        return settled
+
+    def saved(self, baseline: Union[str, PacingProfile] = "default") -> float:
+        """Wall-clock the session saved on delays compared to the `baseline` profile."""
+        return self.stats.cost(self.__resolve(baseline)) - self.stats.spent - self.stats.settle_time
+
+    def reset_stats(self) -> None:
+        self.stats = PacingStats()
+
+    def __area(self, point: Optional[Tuple[int, int]]) -> Optional[Region]:
+        if point is None:
+            return None
+        from macuitest.lib.elements.ui.monitor import monitor
+
+        (x, y), size, radius = (int(i) for i in point), monitor.size, self.settle_radius
+        x2, y2 = min(size.width, x + radius), min(size.height, y + radius)
+        return Region(max(0, x - radius), max(0, y - radius), x2, y2)
+
+    @staticmethod
+    def __resolve(profile: Union[str, PacingProfile], **overrides) -> PacingProfile:
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(
+                    f'Unknown pacing profile "{profile}", pick one of {list(PROFILES)}'
+                )
+            profile = PROFILES[profile]
+        return replace(profile, **overrides) if overrides else profile
+
+
+pacing = Pacing(os.environ.get("MACUITEST_PACING", "default"))
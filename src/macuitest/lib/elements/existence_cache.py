@@ -0,0 +1,59 @@
+"""Short-lived memory of the AppleScript element existence checks."""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from macuitest.lib.elements.controllers.input_events import input_events
+
+
+@dataclass
+class ExistenceCacheStats:
+    """Existence cache counters."""
+
+    hits: int = 0  # Round trips avoided.
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+
+class ExistenceCache:
+    """Remember whether an element (locator and process) exists for `ttl` seconds, so that
+    reading several properties of an element checks its existence once. Everything is
+    forgotten on any synthesized input or element action; `ttl=0` disables the cache."""
+
+    def __init__(self, ttl: float = 0.05):
+        self.ttl = ttl
+        self.stats = ExistenceCacheStats()
+        self.__checks: Dict[Tuple[str, str], Tuple[float, bool]] = dict()
+        self.__lock = threading.Lock()
+        input_events.subscribe(self.invalidate)
+
+    def get(self, locator: str, process: str) -> Optional[bool]:
+        """The remembered existence of the element, None if unknown or outdated."""
+        with self.__lock:
+            checked, exists = self.__checks.get((locator, process), (0.0, None))
+            if exists is None or time.monotonic() - checked > self.ttl:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            return exists
+
+    def put(self, locator: str, process: str, exists: bool) -> None:
+        if self.ttl > 0:
+            with self.__lock:
+                self.__checks[(locator, process)] = (time.monotonic(), bool(exists))
+
+    def invalidate(self) -> None:
+        with self.__lock:
+            if self.__checks:
+                self.__checks.clear()
+                self.stats.invalidations += 1
+
+
+existence_cache = ExistenceCache()
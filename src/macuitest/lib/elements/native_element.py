@@ -1,14 +1,15 @@
-import time
 from typing import Any
 from typing import Optional
 
 from macuitest.config.constants import Frame
 from macuitest.config.constants import Point
 from macuitest.config.constants import Region
+from macuitest.lib import aio
 from macuitest.lib import core
 from macuitest.lib.core import wait_condition
-from macuitest.lib.elements.controllers.mouse import MouseConfig
 from macuitest.lib.elements.controllers.mouse import mouse
+from macuitest.lib.elements.controllers.pacing import pacing
+from macuitest.lib.elements.existence_cache import existence_cache
 from macuitest.lib.elements.native.calls import AXErrorInvalidUIElement
 
 
@@ -18,30 +19,33 @@ class NativeElement:
 
     def _select(self):
         self.item.set_ax_attribute("AXSelected", True)
+        existence_cache.invalidate()
 
-    def _press(self, pause: float = 0.4):
-        time.sleep(pause)
+    def _press(self, pause: Optional[float] = None):
+        pacing.sleep("element_pause", pause)
         self.item.press()
-        time.sleep(0.24)
+        existence_cache.invalidate()
+        pacing.sleep("after_native_press")
+        pacing.settle()
 
-    def double_click_mouse(
-        self, x_off: int = 0, y_off: int = 0, duration: float = MouseConfig.move
-    ):
+    def double_click_mouse(self, x_off: int = 0, y_off: int = 0, duration: Optional[float] = None):
         mouse.double_click(self.frame.center.x + x_off, self.frame.center.y + y_off, duration)
 
     def click_mouse(
         self,
         x_off: int = 0,
         y_off: int = 0,
-        duration: float = MouseConfig.move,
-        hold_time: float = MouseConfig.hold,
+        duration: Optional[float] = None,
+        hold_time: Optional[float] = None,
     ):
         mouse.click(self.frame.center.x + x_off, self.frame.center.y + y_off, hold_time, duration)
 
-    def rightclick_mouse(self, x_off: int = 0, y_off: int = 0, duration=MouseConfig.move):
-        mouse.right_click(self.frame.center.x + x_off, self.frame.center.y + y_off, duration)
+    def rightclick_mouse(self, x_off: int = 0, y_off: int = 0, duration: Optional[float] = None):
+        mouse.right_click(
+            self.frame.center.x + x_off, self.frame.center.y + y_off, duration=duration
+        )
 
-    def hover_mouse(self, x_off: int = 0, y_off: int = 0, duration: float = MouseConfig.move):
+    def hover_mouse(self, x_off: int = 0, y_off: int = 0, duration: Optional[float] = None):
         mouse.hover(self.frame.center.x + x_off, self.frame.center.y + y_off, duration)
 
     def region(self, margin: int = 0):
@@ -95,9 +99,18 @@ class NativeElement:
     def is_visible(self) -> bool:
         return self.exists
 
+    def wait_displayed(self, timeout: [int, float] = 5) -> bool:
+        return wait_condition(lambda: self.__get_axrole() is not None, timeout=timeout)
+
     def wait_vanish(self, timeout: [int, float] = 5) -> bool:
         return wait_condition(lambda: self.__get_axrole() is None, timeout=timeout)
 
+    async def wait_displayed_async(self, timeout: [int, float] = 5) -> bool:
+        return await aio.wait_condition(lambda: self.__get_axrole() is not None, timeout=timeout)
+
+    async def wait_vanish_async(self, timeout: [int, float] = 5) -> bool:
+        return await aio.wait_condition(lambda: self.__get_axrole() is None, timeout=timeout)
+
     @property
     def did_vanish(self) -> bool:
         return wait_condition(lambda: self.__get_axrole() is None)
@@ -118,11 +131,11 @@ class Clickable(NativeElement):
     def is_enabled(self) -> bool:
         return self.item.get_ax_attribute("AXEnabled")
 
-    def press(self, pause: float = 0.375):
-        self._press(pause=pause)
+    def press(self, pause: Optional[float] = None):
+        self._press(pause=pacing.delay("native_pause", pause))
 
-    def click(self, pause: float = 0.375):
-        self._press(pause=pause)
+    def click(self, pause: Optional[float] = None):
+        self._press(pause=pacing.delay("native_pause", pause))
 
 
 class Cell(NativeElement):
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+from macuitest.config.constants import Point
+from macuitest.config.constants import Region
+from macuitest.lib.core import wait_condition
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
+from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.elements.ui_element import UIElement
+
+
+class ScreenMatcher:
+    """Look up a set of UI elements on a single screen snapshot.
+    The screen is captured and converted to grayscale once per `match` call, then every pattern
+    is matched against it. Set `workers` to match in a thread pool (OpenCV releases the GIL)."""
+
+    def __init__(self, elements: Iterable[UIElement], workers: int = 0):
+        self.elements = tuple(elements)
+        self.workers = workers
+        self.__pool: Optional[ThreadPoolExecutor] = None
+        self.__buffer = SnapshotBuffer()  # Reused by the `match` calls of the waits.
+
+    def __repr__(self):
+        return f"<ScreenMatcher elements={len(self.elements)}, workers={self.workers}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self) -> None:
+        """Shut the thread pool down, if any."""
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def match(self, region: Optional[Region] = None) -> Dict[UIElement, Optional[Point]]:
+        """Map every element to its position on the screen or None if it is not displayed."""
+        region = region or Region(0, 0, monitor.size.width, monitor.size.height)
+        screen = self.__buffer.take(region)
+        if self.workers > 1:
+            if self.__pool is None:
+                self.__pool = ThreadPoolExecutor(max_workers=self.workers)
+            points = self.__pool.map(lambda e: e.locate(screen, region), self.elements)
+        else:
+            points = (element.locate(screen, region) for element in self.elements)
+        return dict(zip(self.elements, points))
+
+    def detected(self, region: Optional[Region] = None) -> Dict[UIElement, Point]:
+        """Map the elements displayed on the screen to their positions."""
+        return {e: point for e, point in self.match(region).items() if point is not None}
+
+    def wait_any(
+        self, timeout: Union[int, float] = 5, region: Optional[Region] = None
+    ) -> Dict[UIElement, Point]:
+        """Wait until at least one of the elements is displayed, e.g. whichever dialog shows up."""
+        return wait_condition(lambda: self.detected(region), timeout=timeout) or dict()
+
+    def wait_all(
+        self, timeout: Union[int, float] = 5, region: Optional[Region] = None
+    ) -> Dict[UIElement, Point]:
+        """Wait until all of the elements are displayed at once."""
+
+        def all_detected():
+            detected = self.detected(region)
+            return detected if len(detected) == len(self.elements) else None
+
+        return wait_condition(all_detected, timeout=timeout) or dict()
+
+    def wait_vanish(self, timeout: Union[int, float] = 15, region: Optional[Region] = None) -> bool:
+        """Wait until none of the elements is displayed."""
+        return wait_condition(lambda: not self.detected(region), timeout=timeout)
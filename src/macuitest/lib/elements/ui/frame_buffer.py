@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of preallocated frames written by a single producer thread.
+    A frame handed out to readers stays valid until the producer wraps around to its slot."""
+
+    def __init__(self, capacity: int, shape: Tuple[int, ...], dtype=numpy.uint8):
+        if capacity < 2:
+            raise ValueError("Frame ring buffer needs at least two slots")
+        self.frames = numpy.empty((capacity, *shape), dtype=dtype)
+        self.timestamps = numpy.zeros(capacity)
+        self.count: int = 0  # Frames written so far.
+        self.__condition = threading.Condition()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.frames)
+
+    def next_slot(self) -> numpy.ndarray:
+        """The array the producer should write the next frame into."""
+        return self.frames[self.count % self.capacity]
+
+    def commit(self, timestamp: Optional[float] = None) -> None:
+        """Publish the frame written into `next_slot` and wake the waiting readers up."""
+        with self.__condition:
+            self.timestamps[self.count % self.capacity] = timestamp or time.time()
+            self.count += 1
+            self.__condition.notify_all()
+
+    def latest(self) -> Tuple[int, Optional[numpy.ndarray]]:
+        """Return the number of frames written so far and the latest frame (read-only)."""
+        count = self.count
+        if not count:
+            return count, None
+        frame = self.frames[(count - 1) % self.capacity].view()
+        frame.flags.writeable = False
+        return count, frame
+
+    def wait_new_frame(self, after: int, timeout: Optional[float] = None) -> bool:
+        """Block until more than `after` frames have been written."""
+        with self.__condition:
+            return self.__condition.wait_for(lambda: self.count > after, timeout=timeout)
+
+    def recent(self, seconds: Optional[float] = None) -> List[Tuple[float, numpy.ndarray]]:
+        """Copy the frames taken within the last `seconds` (all buffered ones by default)."""
+        with self.__condition:
+            count = self.count
+            # The oldest slot is skipped: the producer may be writing into it right now.
+            indices = [i % self.capacity for i in range(max(0, count - self.capacity + 1), count)]
+            since = time.time() - seconds if seconds is not None else 0.0
+            return [
+                (float(self.timestamps[i]), self.frames[i].copy())
+                for i in indices
+                if self.timestamps[i] >= since
+            ]
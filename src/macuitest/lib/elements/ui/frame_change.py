@@ -0,0 +1,50 @@
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+
+class FrameChangeDetector:
+    """Compare consecutive snapshots of the same screen area tile by tile.
+    Lets pollers skip the work when the area has not changed since the previous tick."""
+
+    def __init__(self, tile: int = 32):
+        self.tile = tile
+        self.__previous: Optional[numpy.ndarray] = None
+        self.__changed: Optional[numpy.ndarray] = None  # Changed pixels, padded to whole tiles.
+
+    def reset(self) -> None:
+        self.__previous = None
+
+    def update(self, frame: numpy.ndarray) -> Optional[numpy.ndarray]:
+        """Remember `frame` and compare it to the previous one. The buffers are reused
+        as long as the frame size stays the same.
+        :return: Boolean grid of changed tiles, or None if there is nothing to compare to."""
+        previous = self.__previous
+        if previous is None or previous.shape != frame.shape:
+            self.__previous = frame.copy()
+            height, width = frame.shape[:2]
+            rows, columns = -(-height // self.tile), -(-width // self.tile)
+            self.__changed = numpy.zeros((rows * self.tile, columns * self.tile), dtype=bool)
+            return None
+        height, width = frame.shape[:2]
+        changed = self.__changed[:height, :width]
+        if frame.ndim == 3:
+            numpy.not_equal(previous, frame).any(axis=2, out=changed)
+        else:
+            numpy.not_equal(previous, frame, out=changed)
+        numpy.copyto(previous, frame)
+        rows, columns = self.__changed.shape[0] // self.tile, self.__changed.shape[1] // self.tile
+        return self.__changed.reshape(rows, self.tile, columns, self.tile).any(axis=(1, 3))
+
+    def changed_area(self, tiles: numpy.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Convert a grid of changed tiles to a (x1, y1, x2, y2) pixel bounding box."""
+        rows, columns = numpy.nonzero(tiles)
+        if not rows.size:
+            return None
+        return (
+            int(columns.min()) * self.tile,
+            int(rows.min()) * self.tile,
+            (int(columns.max()) + 1) * self.tile,
+            (int(rows.max()) + 1) * self.tile,
+        )
@@ -0,0 +1,128 @@
+"""Screen frame sources the Monitor reads snapshots from."""
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import cv2
+import numpy
+
+from macuitest.config.constants import Region
+from macuitest.config.constants import ScreenSize
+
+
+class FrameSource:
+    """Supplies BGRA frames of the screen. Regions are given in screen points,
+    frames are in pixels, i.e. `scale` times larger on Retina displays."""
+
+    @property
+    def size(self) -> ScreenSize:
+        raise NotImplementedError
+
+    @property
+    def scale(self) -> int:
+        raise NotImplementedError
+
+    def grab(self, region: Optional[Region] = None) -> numpy.ndarray:
+        """Return a (height, width, 4) BGRA image of `region` (or of the whole screen)."""
+        raise NotImplementedError
+
+    def save(
+        self, where: Union[str, Path], region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Union[str, Path]:
+        """Save a frame of the (x, y, width, height) `region` to `where` as an image file."""
+        if region is not None:
+            x, y, width, height = region
+            region = Region(x, y, x + width, y + height)
+        cv2.imwrite(str(where), self.grab(region))
+        return where
+
+
+class ReplayFrameSource(FrameSource):
+    """Serve frames recorded earlier, e.g. with `monitor.dump_frames`, to run the vision code
+    without a logged-in macOS session.
+    `recording` is a folder of PNG/NPY frames, a single image, or an `.npy` stack of frames
+    shaped (count, height, width[, channels]) that is memory-mapped rather than loaded.
+    Without `fps` every grab advances to the next frame; otherwise frames follow the clock.
+    The sequence is looped. Image files are decoded once and kept in memory."""
+
+    extensions: Tuple[str, ...] = (".png", ".npy")
+
+    def __init__(self, recording: Union[str, Path], scale: int = 1, fps: Optional[float] = None):
+        self.recording = Path(recording)
+        self.__scale = scale
+        self.fps = fps
+        self.position: int = -1
+        self.__started: Optional[float] = None
+        self.__files: List[Path] = list()
+        self.__stack: Optional[numpy.ndarray] = None
+        self.__decoded: Dict[int, numpy.ndarray] = dict()
+        self.__size: Optional[ScreenSize] = None
+        if self.recording.is_dir():
+            self.__files = sorted(
+                p for p in self.recording.iterdir() if p.suffix.lower() in self.extensions
+            )
+        elif self.recording.suffix.lower() == ".npy":
+            stack = numpy.load(self.recording, mmap_mode="r")
+            is_stack = stack.ndim == 4 or stack.ndim == 3 and stack.shape[-1] > 4
+            self.__stack = stack if is_stack else stack[None]
+        else:
+            self.__files = [self.recording]
+        if not len(self):
+            raise FileNotFoundError(f"No frames found in: {self.recording}")
+
+    def __len__(self):
+        return len(self.__stack) if self.__stack is not None else len(self.__files)
+
+    @property
+    def scale(self) -> int:
+        return self.__scale
+
+    @property
+    def size(self) -> ScreenSize:
+        if self.__size is None:
+            height, width = self.frame(0).shape[:2]
+            self.__size = ScreenSize(width // self.scale, height // self.scale)
+        return self.__size
+
+    def grab(self, region: Optional[Region] = None) -> numpy.ndarray:
+        frame = self.frame(self.__next_position())
+        if region is None:
+            return frame
+        x1, y1, x2, y2 = (int(i * self.scale) for i in (region.x1, region.y1, region.x2, region.y2))
+        return frame[y1:y2, x1:x2]
+
+    def frame(self, position: int) -> numpy.ndarray:
+        """Return the recorded frame at `position` as a read-only BGRA image."""
+        index = position % len(self)
+        frame = self.__decoded.get(index)
+        if frame is None:
+            if self.__stack is not None:
+                frame = self.__stack[index]
+            elif self.__files[index].suffix.lower() == ".npy":
+                frame = numpy.load(self.__files[index], mmap_mode="r")
+            else:
+                frame = cv2.imread(str(self.__files[index]), cv2.IMREAD_UNCHANGED)
+            frame = _to_bgra(frame)
+            frame.flags.writeable = False
+            self.__decoded[index] = frame
+        return frame
+
+    def __next_position(self) -> int:
+        if self.fps is None:
+            self.position += 1
+        else:
+            self.__started = self.__started or time.monotonic()
+            self.position = int((time.monotonic() - self.__started) * self.fps)
+        return self.position
+
+
+def _to_bgra(frame: numpy.ndarray) -> numpy.ndarray:
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGRA)
+    if frame.shape[2] == 3:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+    return frame
@@ -0,0 +1,63 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+from typing import Union
+
+from macuitest.config.constants import Point
+from macuitest.config.constants import ScreenSize
+
+
+@dataclass
+class HintStats:
+    """Last-known-location lookup counters."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+
+class LocationHints:
+    """Storage of the positions UI elements were last found at, keyed by pattern path
+    and screen size. Optionally persisted to a JSON file to be reused across test sessions."""
+
+    def __init__(self):
+        self.stats = HintStats()
+        self.storage: Optional[Path] = None
+        self.__locations: Dict[str, Point] = dict()
+
+    def attach(self, storage: Union[str, Path]) -> None:
+        """Load hints from `storage` and persist them there on `save`."""
+        self.storage = Path(storage)
+        if self.storage.exists():
+            for key, (x, y) in json.loads(self.storage.read_text()).items():
+                self.__locations.setdefault(key, Point(x, y))
+
+    def save(self) -> None:
+        if self.storage is None:
+            return
+        self.storage.parent.mkdir(parents=True, exist_ok=True)
+        self.storage.write_text(
+            json.dumps({key: (p.x, p.y) for key, p in self.__locations.items()}, indent=2)
+        )
+
+    def get(self, path: Union[str, Path], screen: ScreenSize) -> Optional[Point]:
+        return self.__locations.get(self.__key(path, screen))
+
+    def set(self, path: Union[str, Path], screen: ScreenSize, location: Point) -> None:
+        self.__locations[self.__key(path, screen)] = location
+
+    def clear(self) -> None:
+        self.__locations.clear()
+        self.stats = HintStats()
+
+    @staticmethod
+    def __key(path: Union[str, Path], screen: ScreenSize) -> str:
+        return f"{Path(path).as_posix()}@{screen.width}x{screen.height}"
+
+
+location_hints = LocationHints()
@@ -0,0 +1,117 @@
+"""Template matching routines used by screen based elements."""
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import cv2
+import numpy
+
+Match = Tuple[float, Tuple[int, int]]
+
+
+def pyramid_levels(template: numpy.ndarray, min_side: int = 16, max_levels: int = 3) -> int:
+    """Count how many times `template` can be halved while its smaller side stays >= `min_side`."""
+    side, levels = min(template.shape[:2]), 0
+    while levels < max_levels and side // 2 >= min_side:
+        side //= 2
+        levels += 1
+    return levels
+
+
+def downscale(image: numpy.ndarray, levels: int) -> numpy.ndarray:
+    """Build the `levels`-th Gaussian pyramid level of `image`."""
+    for _ in range(levels):
+        image = cv2.pyrDown(image)
+    return image
+
+
+def match_template(screen: numpy.ndarray, template: numpy.ndarray) -> Match:
+    """Single-scale lookup: return the best similarity and its top left (x, y) position."""
+    _, similarity, _, position = cv2.minMaxLoc(
+        cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+    )
+    return similarity, position
+
+
+def match_template_pyramid(
+    screen: numpy.ndarray,
+    template: numpy.ndarray,
+    similarity: float,
+    levels: Optional[int] = None,
+    small_template: Optional[numpy.ndarray] = None,
+    candidates: int = 3,
+    slack: float = 0.15,
+) -> Match:
+    """Coarse-to-fine lookup.
+    Search a downsampled screen/template pair first, then refine the best `candidates` coarse peaks
+    (those scoring at least `similarity - slack`) at full resolution in a small neighbourhood."""
+    levels = pyramid_levels(template) if levels is None else levels
+    if levels == 0:
+        return match_template(screen, template)
+    small_screen = downscale(screen, levels)
+    small_template = downscale(template, levels) if small_template is None else small_template
+    if any(s < t for s, t in zip(small_screen.shape, small_template.shape)):
+        return match_template(screen, template)
+    coarse = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED)
+    refined = [
+        _refine(screen, template, x << levels, y << levels, 2 << levels)
+        for score, (x, y) in _top_peaks(coarse, small_template.shape, candidates)
+        if score >= similarity - slack
+    ]
+    if refined:
+        return max(refined)
+    _, score, _, (x, y) = cv2.minMaxLoc(coarse)
+    return score, (x << levels, y << levels)
+
+
+def find_matches(
+    screen: numpy.ndarray,
+    template: numpy.ndarray,
+    similarity: float,
+    max_results: int = 100,
+    min_distance: Optional[int] = None,
+) -> List[Match]:
+    """Find every occurrence of `template` scoring at least `similarity` in one match pass.
+    Peaks closer than `min_distance` pixels (half of the smaller template side by default)
+    to a stronger one are suppressed. Matches are sorted by similarity, best first."""
+    if min_distance is None:
+        min_distance = max(1, min(template.shape[:2]) // 2)
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+    threshold = similarity - 0.0005  # Scores are compared rounded to 3 digits.
+    kernel = numpy.ones((2 * min_distance + 1, 2 * min_distance + 1), numpy.uint8)
+    peaks = (result >= threshold) & (result >= cv2.dilate(result, kernel))
+    ys, xs = numpy.nonzero(peaks)
+    order = numpy.argsort(-result[ys, xs], kind="stable")
+    ys, xs = ys[order], xs[order]
+    # Local maxima closer than `min_distance` are ties of one plateau: drop every peak that has
+    # a stronger (or earlier tied) one nearby. Rows go in blocks to bound the pairwise matrix.
+    keep, indexes = numpy.ones(len(ys), dtype=bool), numpy.arange(len(ys))
+    for start in range(0, len(ys), 1024):
+        rows = indexes[start : start + 1024, None]
+        close = (numpy.abs(xs[rows] - xs) < min_distance) & (
+            numpy.abs(ys[rows] - ys) < min_distance
+        )
+        keep &= ~(close & (rows < indexes)).any(axis=0)
+    ys, xs = ys[keep][:max_results], xs[keep][:max_results]
+    return [(float(result[y, x]), (int(x), int(y))) for y, x in zip(ys, xs)]
+
+
+def _top_peaks(result: numpy.ndarray, template_shape: Tuple[int, ...], count: int) -> List[Match]:
+    """Pick up to `count` strongest peaks of a match result, suppressing each peak's footprint."""
+    result, peaks = result.copy(), []
+    height, width = template_shape[:2]
+    for _ in range(count):
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        peaks.append((score, (x, y)))
+        y1, x1 = max(0, y - height // 2), max(0, x - width // 2)
+        result[y1 : y + height // 2 + 1, x1 : x + width // 2 + 1] = -1
+    return peaks
+
+
+def _refine(screen: numpy.ndarray, template: numpy.ndarray, x: int, y: int, pad: int) -> Match:
+    """Run a full resolution lookup in a window around the (x, y) coarse estimate."""
+    height, width = template.shape[:2]
+    x1, y1 = max(0, x - pad), max(0, y - pad)
+    x2, y2 = min(screen.shape[1], x + width + pad), min(screen.shape[0], y + height + pad)
+    score, (dx, dy) = match_template(screen[y1:y2, x1:x2], template)
+    return score, (x1 + dx, y1 + dy)
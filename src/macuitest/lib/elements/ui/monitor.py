@@ -1,91 +1,344 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import Union
 
-import AppKit
+import cv2
 import numpy
-import Quartz
-from Foundation import NSURL
-from Quartz import CGDisplayBounds
-from Quartz import CGMainDisplayID
-from Quartz import CoreGraphics
 
 from macuitest.config.constants import Region
 from macuitest.config.constants import ScreenSize
+from macuitest.lib.elements.controllers.input_events import input_events
+from macuitest.lib.elements.ui.frame_buffer import FrameRingBuffer
+from macuitest.lib.elements.ui.frame_sources import FrameSource
+from macuitest.lib.elements.ui.pixels import convert
+
+
+@dataclass
+class SnapshotCacheStats:
+    """Snapshot cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    capture_time: float = 0.0  # Seconds spent capturing the screen on cache misses.
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+    @property
+    def saved_time(self) -> float:
+        """Estimated capture time saved by the cache hits, in seconds."""
+        return self.hits * self.capture_time / self.misses if self.misses else 0.0
 
 
 class Monitor:
-    def __init__(self):
-        self.__is_retina: Optional[bool] = None
-        self.__screen_size: Optional[ScreenSize] = None
-
-    def make_snapshot(self, region: Optional[Region] = None) -> numpy.ndarray:
-        h, w = (
-            (region.y2 - region.y1, region.x2 - region.x1)
-            if region
-            else (self.size.height, self.size.width)
+    def __init__(self, source: Optional[FrameSource] = None):
+        self.__source: Optional[FrameSource] = source
+        self.cache_max_age: Optional[float] = None
+        self.cache_max_entries: int = 16
+        self.cache_stats = SnapshotCacheStats()
+        self.__snapshots: Dict[Optional[Tuple], Tuple[float, numpy.ndarray]] = dict()
+        self.frames: Optional[FrameRingBuffer] = None
+        self.__frames_grayscale: bool = False
+        self.__capture_thread: Optional[threading.Thread] = None
+        self.__capture_stop = threading.Event()
+        self.__capture_lock = threading.Lock()
+        input_events.subscribe(self.invalidate_cache)
+
+    @property
+    def source(self) -> FrameSource:
+        """Where the frames come from, the live screen unless another source is set."""
+        if self.__source is None:
+            from macuitest.lib.elements.ui.quartz_source import QuartzFrameSource
+
+            self.__source = QuartzFrameSource()
+        return self.__source
+
+    def set_source(self, source: Optional[FrameSource] = None) -> None:
+        """Read the frames from `source`, e.g. a `ReplayFrameSource`; None restores the screen."""
+        self.stop_capture()
+        with self.__capture_lock:
+            self.frames = None
+        self.invalidate_cache()
+        self.__source = source
+
+    @property
+    def is_capturing(self) -> bool:
+        """Whether the background capture runs. It stops on its own if the screen resolution
+        changes, `make_snapshot` captures the screen directly from then on."""
+        return self.__capture_thread is not None
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames captured by the background capture so far."""
+        return self.frames.count if self.frames is not None else 0
+
+    def start_capture(self, fps: float = 10, capacity: int = 50, grayscale: bool = False) -> None:
+        """Capture the screen `fps` times a second in a background thread into a ring buffer
+        of `capacity` preallocated frames. While it runs `make_snapshot` serves the latest frame."""
+        self.stop_capture()
+        first = self.capture(grayscale=grayscale)
+        frames = FrameRingBuffer(capacity, first.shape)
+        numpy.copyto(frames.next_slot(), first)
+        frames.commit()
+        with self.__capture_lock:
+            self.frames, self.__frames_grayscale = frames, grayscale
+        self.__capture_stop.clear()
+        self.__capture_thread = threading.Thread(
+            target=self.__capture_frames, args=(1 / fps, grayscale), name="monitor", daemon=True
+        )
+        self.__capture_thread.start()
+
+    def stop_capture(self) -> None:
+        """Stop the background capture. Captured frames are kept to be dumped if needed."""
+        with self.__capture_lock:
+            thread, self.__capture_thread = self.__capture_thread, None
+        if thread is not None:
+            self.__capture_stop.set()
+            thread.join()
+
+    def wait_new_frame(self, after: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Wait until the background capture takes a frame newer than the `after`-th one
+        (than the current latest one by default)."""
+        with self.__capture_lock:
+            frames = self.frames
+        if not self.is_capturing or frames is None:
+            return False
+        return frames.wait_new_frame(frames.count if after is None else after, timeout)
+
+    def dump_frames(self, where: Union[str, Path], seconds: Optional[float] = None) -> List[Path]:
+        """Save the frames captured within the last `seconds` to `where` folder as PNG files."""
+        if self.frames is None:
+            return list()
+        Path(where).mkdir(parents=True, exist_ok=True)
+        saved = list()
+        for timestamp, frame in self.frames.recent(seconds):
+            destination = Path(where).joinpath(f"frame_{timestamp:.3f}.png")
+            cv2.imwrite(str(destination), frame)
+            saved.append(destination)
+        return saved
+
+    def __capture_frames(self, interval: float, grayscale: bool) -> None:
+        try:
+            while not self.__capture_stop.is_set():
+                started = time.monotonic()
+                frame, slot = self.source.grab(), self.frames.next_slot()
+                if frame.shape[:2] != slot.shape[:2]:  # The screen resolution has changed.
+                    break
+                convert(frame, grayscale=grayscale, out=slot)
+                self.frames.commit()
+                self.__capture_stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            with self.__capture_lock:
+                if self.__capture_thread is threading.current_thread():
+                    self.__capture_thread = None
+
+    def enable_cache(self, max_age: float = 0.05) -> None:
+        """Serve snapshots that are not older than `max_age` seconds from the cache."""
+        self.cache_max_age = max_age
+
+    def disable_cache(self) -> None:
+        self.cache_max_age = None
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        self.__snapshots.clear()
+
+    @contextmanager
+    def snapshot_cache(self, max_age: float = 0.05):
+        """Enable the snapshot cache for the duration of a `with` block."""
+        previous = self.cache_max_age
+        self.enable_cache(max_age)
+        try:
+            yield self.cache_stats
+        finally:
+            self.cache_max_age = previous
+            self.invalidate_cache()
+
+    def make_snapshot(
+        self,
+        region: Optional[Region] = None,
+        grayscale: bool = False,
+        out: Optional[numpy.ndarray] = None,
+        copy: bool = True,
+    ) -> numpy.ndarray:
+        """Take a BGRA (or grayscale) snapshot of the screen `region`.
+        It is served from the background capture or the snapshot cache when those are enabled.
+        The cache crops the region out of any cached snapshot containing it, a grayscale request
+        is also served from a BGRA snapshot.
+        :param out: Preallocated array of a matching shape to write the snapshot into.
+        :param copy: False serves a frame of the background capture as a read-only view of its
+                     ring buffer slot, valid only until the capture wraps around to the slot."""
+        key = (self.__region_key(region), grayscale)
+        snapshot = self.__latest_frame(key, copy and out is None) if self.is_capturing else None
+        if snapshot is not None:
+            return self.__output(snapshot, out)
+        if self.cache_max_age is None:
+            return self.capture(region, grayscale=grayscale, out=out)
+        snapshot = self.__cached_snapshot(key)
+        if snapshot is not None:
+            self.cache_stats.hits += 1
+        else:
+            started = time.perf_counter()
+            snapshot = self.capture(region, grayscale=grayscale)
+            self.cache_stats.capture_time += time.perf_counter() - started
+            self.cache_stats.misses += 1
+            snapshot.flags.writeable = False  # Shared between callers.
+            self.__store(key, time.monotonic(), snapshot)
+        return self.__output(snapshot, out)
+
+    def __region_key(self, region: Optional[Region]) -> Optional[Tuple[int, int, int, int]]:
+        """The region as an (x1, y1, x2, y2) tuple, None if it covers the whole screen."""
+        if region is None:
+            return None
+        key, size = (region.x1, region.y1, region.x2, region.y2), self.size
+        return None if key == (0, 0, size.width, size.height) else key
+
+    @staticmethod
+    def __output(snapshot: numpy.ndarray, out: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        if out is None:
+            return snapshot
+        if out.shape != snapshot.shape:
+            raise ValueError(f"Output shape {out.shape} does not match {snapshot.shape}")
+        numpy.copyto(out, snapshot)
+        return out
+
+    def __latest_frame(self, key: Tuple, copy: bool = True) -> Optional[numpy.ndarray]:
+        """Serve the region from the latest frame of the background capture."""
+        region, grayscale = key
+        with self.__capture_lock:
+            frames, frames_grayscale = self.frames, self.__frames_grayscale
+        if frames is None or frames_grayscale and not grayscale:
+            return None
+        _, frame = frames.latest()
+        frame = frame if region is None else self.__crop(frame, region)
+        if frame is None:
+            return None
+        if grayscale != frames_grayscale:
+            return convert(frame, grayscale=True)
+        return frame.copy() if copy else frame
+
+    def __cached_snapshot(self, key: Tuple) -> Optional[numpy.ndarray]:
+        """Look the region up, or crop it from a cached snapshot containing it. A grayscale
+        snapshot converted from a BGRA one is cached as well."""
+        region, grayscale = key
+        self.__expire()
+        # The exact region first, then snapshots of the same color mode.
+        candidates = sorted(
+            self.__snapshots.items(), key=lambda i: (i[0] != key, i[0][1] != key[1])
         )
-        pixel_data = self.get_pixel_data(region=region)
-        _image = numpy.frombuffer(pixel_data[0], dtype=numpy.uint8)
-        return _image.reshape((h, pixel_data[1], 4))[:, :w, :]
+        for (origin, cached_grayscale), (taken, snapshot) in candidates:
+            if cached_grayscale and not grayscale:
+                continue
+            snapshot = snapshot if origin == region else self.__crop(snapshot, region, origin)
+            if snapshot is None:
+                continue
+            if cached_grayscale != grayscale:
+                snapshot = convert(snapshot, grayscale=True)
+                snapshot.flags.writeable = False
+                self.__store(key, taken, snapshot)
+            return snapshot
+
+    def __store(self, key: Tuple, taken: float, snapshot: numpy.ndarray) -> None:
+        """Cache the snapshot, dropping the oldest ones beyond `cache_max_entries`."""
+        self.__expire()
+        self.__snapshots[key] = (taken, snapshot)
+        while len(self.__snapshots) > self.cache_max_entries:
+            del self.__snapshots[min(self.__snapshots, key=lambda k: self.__snapshots[k][0])]
+
+    def __expire(self) -> None:
+        """Drop the snapshots older than `cache_max_age`."""
+        deadline = time.monotonic() - self.cache_max_age
+        for key in [key for key, (taken, _) in self.__snapshots.items() if taken < deadline]:
+            del self.__snapshots[key]
+
+    def __crop(
+        self, snapshot: numpy.ndarray, region: Optional[Tuple], origin: Optional[Tuple] = None
+    ) -> Optional[numpy.ndarray]:
+        """Cut the (x1, y1, x2, y2) `region` in screen points out of a snapshot of the `origin`
+        region (of the whole screen by default). None if the snapshot does not contain it."""
+        if region is None:
+            return snapshot if origin is None else None
+        x, y = (0, 0) if origin is None else origin[:2]
+        scale = self.source.scale
+        x1, y1, x2, y2 = (int((i - o) * scale) for i, o in zip(region, (x, y, x, y)))
+        if x1 >= 0 and y1 >= 0 and y2 <= snapshot.shape[0] and x2 <= snapshot.shape[1]:
+            return snapshot[y1:y2, x1:x2]
+
+    def capture(
+        self,
+        region: Optional[Region] = None,
+        grayscale: bool = False,
+        out: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """Capture the screen bypassing the snapshot cache.
+        A BGRA result is a read-only view of the captured bitmap: nothing is copied unless
+        a grayscale conversion or an `out` buffer is requested."""
+        return convert(self.source.grab(region), grayscale=grayscale, out=out)
 
     @property
     def bytes(self):
-        return bytes(numpy.frombuffer(self.get_pixel_data()[0], numpy.uint8))
+        return self.capture().tobytes()
 
     @property
     def is_retina(self) -> bool:
-        if self.__is_retina is None:
-            self.__is_retina = AppKit.NSScreen.mainScreen().backingScaleFactor() > 1.0
-        return self.__is_retina
+        return self.source.scale > 1
 
     @property
     def size(self) -> ScreenSize:
-        if self.__screen_size is None:
-            size = CGDisplayBounds(CGMainDisplayID()).size
-            self.__screen_size = ScreenSize(int(size.width), int(size.height))
-        return self.__screen_size
+        return self.source.size
 
     @staticmethod
-    def get_pixel_data(region: Optional[Region] = None):
-        region = (
-            CoreGraphics.CGRectInfinite
-            if region is None
-            else CoreGraphics.CGRectMake(
-                region.x1, region.y1, region.x2 - region.x1, region.y2 - region.y1
-            )
-        )
-        image = CoreGraphics.CGWindowListCreateImage(
-            region,
-            CoreGraphics.kCGWindowListOptionOnScreenOnly,
-            CoreGraphics.kCGNullWindowID,
-            CoreGraphics.kCGWindowImageDefault,
-        )
-        pixel_data = CoreGraphics.CGDataProviderCopyData(CoreGraphics.CGImageGetDataProvider(image))
-        bytes_per_row = CoreGraphics.CGImageGetBytesPerRow(image) // 4
-        return pixel_data, bytes_per_row
+    def create_image(region: Optional[Region] = None):
+        """Capture the `region` (or all the displays) as a CGImage."""
+        from macuitest.lib.elements.ui.quartz_source import QuartzFrameSource
+
+        return QuartzFrameSource.create_image(region)
 
     @staticmethod
+    def get_pixel_data(region: Optional[Region] = None):
+        from macuitest.lib.elements.ui.quartz_source import QuartzFrameSource
+
+        return QuartzFrameSource.get_pixel_data(region)
+
     def save_screenshot(
-        where: Union[str, Path], region: Optional[Tuple[int, int, int, int]] = None
+        self, where: Union[str, Path], region: Optional[Tuple[int, int, int, int]] = None
     ) -> Union[str, Path]:
         """Take a screenshot and save it to `where.
         Note: Region is defined by (x, y) pair of top left point, and width, length params.
         """
-        region = CoreGraphics.CGRectInfinite if region is None else CoreGraphics.CGRectMake(*region)
-        image = CoreGraphics.CGWindowListCreateImage(
-            region,
-            CoreGraphics.kCGWindowListOptionOnScreenOnly,
-            CoreGraphics.kCGNullWindowID,
-            CoreGraphics.kCGWindowImageDefault,
-        )
-        destination = Quartz.CGImageDestinationCreateWithURL(
-            NSURL.fileURLWithPath_(str(where)), "public.png", 1, None
-        )
-        Quartz.CGImageDestinationAddImage(destination, image, dict())
-        Quartz.CGImageDestinationFinalize(destination)
-        return where
+        return self.source.save(where, region)
 
 
 monitor = Monitor()
+
+
+class SnapshotBuffer:
+    """An array reused for the snapshots taken by a polling loop, so that a wait does not
+    allocate a new screen-sized array on every attempt. A snapshot is only valid until
+    the next `take`."""
+
+    def __init__(self, grayscale: bool = True, screen: Monitor = monitor):
+        self.grayscale = grayscale
+        self.screen = screen
+        self.__array: Optional[numpy.ndarray] = None
+
+    def take(self, region: Optional[Region] = None) -> numpy.ndarray:
+        """Take a snapshot of the screen `region` into the buffer."""
+        if self.__array is not None:
+            try:
+                return self.screen.make_snapshot(region, self.grayscale, out=self.__array)
+            except ValueError:  # The region or the screen resolution has changed.
+                self.__array = None
+        snapshot = self.screen.make_snapshot(region, self.grayscale)
+        if not (snapshot.flags.writeable and snapshot.flags.owndata):
+            snapshot = snapshot.copy()  # A view of a capture or a shared cached snapshot.
+        self.__array = snapshot
+        return snapshot
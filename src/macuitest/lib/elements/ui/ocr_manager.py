@@ -8,6 +8,7 @@ import pytesseract
 
 from macuitest.config.constants import Region
 from macuitest.lib.core import wait_condition
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
 from macuitest.lib.elements.ui.monitor import monitor
 
 
@@ -25,10 +26,14 @@ class OCRManager:
         self.__assert_trained_data_present()
 
     def wait_text(self, text: str, where: Region, timeout: int = 10) -> bool:
-        return wait_condition(lambda: self.recognize(region=where) == text, timeout=timeout)
+        buffer = SnapshotBuffer()
+        return wait_condition(lambda: self.read(buffer.take(where)) == text, timeout=timeout)
 
     def recognize(self, region: Region, is_font_white: bool = False) -> str:
-        img_gray = cv2.cvtColor(monitor.make_snapshot(region), cv2.COLOR_BGR2GRAY)
+        return self.read(monitor.make_snapshot(region, grayscale=True), is_font_white)
+
+    def read(self, img_gray, is_font_white: bool = False) -> str:
+        """Recognize the text on a grayscale snapshot taken beforehand."""
         if (
             is_font_white
         ):  # We want to invert font color to get better character recognition results.
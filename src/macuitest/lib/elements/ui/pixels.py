@@ -0,0 +1,30 @@
+"""Helpers to interpret raw screen capture bytes without copying them."""
+from typing import Optional
+
+import cv2
+import numpy
+
+
+def bgra_view(buffer, width: int, height: int, bytes_per_row: int) -> numpy.ndarray:
+    """Expose a BGRA bitmap as a (height, width, 4) array sharing memory with `buffer`.
+    Row padding (`bytes_per_row` may exceed `width * 4`) is skipped by the row stride."""
+    data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+    return numpy.lib.stride_tricks.as_strided(
+        data, shape=(height, width, 4), strides=(bytes_per_row, 4, 1), writeable=False
+    )
+
+
+def convert(
+    bgra: numpy.ndarray, grayscale: bool = False, out: Optional[numpy.ndarray] = None
+) -> numpy.ndarray:
+    """Return the BGRA `bgra` image as is, or converted to grayscale right away.
+    When `out` is given the result is written into it instead of a new array.
+    :raises ValueError: If `out` does not match the shape of the result."""
+    if grayscale:
+        if out is not None and out.shape != bgra.shape[:2]:
+            raise ValueError(f"Output shape {out.shape} does not match {bgra.shape[:2]}")
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=out)
+    if out is None:
+        return bgra
+    numpy.copyto(out, bgra)
+    return out
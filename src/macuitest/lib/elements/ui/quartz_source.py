@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import AppKit
+import numpy
+import Quartz
+from Foundation import NSURL
+from Quartz import CGDisplayBounds
+from Quartz import CGMainDisplayID
+from Quartz import CoreGraphics
+
+from macuitest.config.constants import Region
+from macuitest.config.constants import ScreenSize
+from macuitest.lib.elements.ui.frame_sources import FrameSource
+from macuitest.lib.elements.ui.pixels import bgra_view
+
+
+class QuartzFrameSource(FrameSource):
+    """Capture the live screen with `CGWindowListCreateImage`."""
+
+    def __init__(self):
+        self.__scale: Optional[int] = None
+        self.__screen_size: Optional[ScreenSize] = None
+
+    @property
+    def scale(self) -> int:
+        if self.__scale is None:
+            self.__scale = 2 if AppKit.NSScreen.mainScreen().backingScaleFactor() > 1.0 else 1
+        return self.__scale
+
+    @property
+    def size(self) -> ScreenSize:
+        if self.__screen_size is None:
+            size = CGDisplayBounds(CGMainDisplayID()).size
+            self.__screen_size = ScreenSize(int(size.width), int(size.height))
+        return self.__screen_size
+
+    def grab(self, region: Optional[Region] = None) -> numpy.ndarray:
+        """A read-only view of the captured bitmap, nothing is copied."""
+        image = self.create_image(region)
+        return bgra_view(
+            CoreGraphics.CGDataProviderCopyData(CoreGraphics.CGImageGetDataProvider(image)),
+            CoreGraphics.CGImageGetWidth(image),
+            CoreGraphics.CGImageGetHeight(image),
+            CoreGraphics.CGImageGetBytesPerRow(image),
+        )
+
+    def save(
+        self, where: Union[str, Path], region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Union[str, Path]:
+        region = CoreGraphics.CGRectInfinite if region is None else CoreGraphics.CGRectMake(*region)
+        image = CoreGraphics.CGWindowListCreateImage(
+            region,
+            CoreGraphics.kCGWindowListOptionOnScreenOnly,
+            CoreGraphics.kCGNullWindowID,
+            CoreGraphics.kCGWindowImageDefault,
+        )
+        destination = Quartz.CGImageDestinationCreateWithURL(
+            NSURL.fileURLWithPath_(str(where)), "public.png", 1, None
+        )
+        Quartz.CGImageDestinationAddImage(destination, image, dict())
+        Quartz.CGImageDestinationFinalize(destination)
+        return where
+
+    @staticmethod
+    def create_image(region: Optional[Region] = None):
+        """Capture the `region` (or all the displays) as a CGImage."""
+        region = (
+            CoreGraphics.CGRectInfinite
+            if region is None
+            else CoreGraphics.CGRectMake(
+                region.x1, region.y1, region.x2 - region.x1, region.y2 - region.y1
+            )
+        )
+        return CoreGraphics.CGWindowListCreateImage(
+            region,
+            CoreGraphics.kCGWindowListOptionOnScreenOnly,
+            CoreGraphics.kCGNullWindowID,
+            CoreGraphics.kCGWindowImageDefault,
+        )
+
+    @staticmethod
+    def get_pixel_data(region: Optional[Region] = None):
+        image = QuartzFrameSource.create_image(region)
+        pixel_data = CoreGraphics.CGDataProviderCopyData(CoreGraphics.CGImageGetDataProvider(image))
+        bytes_per_row = CoreGraphics.CGImageGetBytesPerRow(image) // 4
+        return pixel_data, bytes_per_row
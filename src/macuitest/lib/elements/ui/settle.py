@@ -0,0 +1,116 @@
+"""Wait until the UI stops changing instead of sleeping for a fixed time."""
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Sequence
+
+from macuitest.config.constants import Region
+from macuitest.lib.elements.ui.frame_change import FrameChangeDetector
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
+
+AX_ATTRIBUTES = ("AXRole", "AXValue", "AXTitle", "AXEnabled", "AXFocused", "AXPosition", "AXSize")
+
+
+def ax_digest(item, attributes: Sequence[str] = AX_ATTRIBUTES, depth: int = 3) -> int:
+    """Hash the `attributes` of an accessibility `item` and its descendants `depth` levels down.
+    `item` is anything with `get_ax_attribute`, e.g. a `NativeUIElement`."""
+    if item is None:
+        return hash(None)
+    values = list(repr(item.get_ax_attribute(attribute)) for attribute in attributes)
+    if depth > 0:
+        values.extend(ax_digest(child, attributes, depth - 1) for child in _children(item))
+    return hash(tuple(values))
+
+
+def _children(item) -> list:
+    try:
+        return item.get_ax_attribute("AXChildren") or list()
+    except (AttributeError, IndexError):
+        return list()
+
+
+class SettleDetector:
+    """Poll a probe of the UI state every `interval` seconds and report once it has returned
+    the same value for `quiet` seconds, or give up after `timeout` seconds.
+    Screen areas are compared tile by tile, accessibility subtrees by attribute hashes."""
+
+    def __init__(self, quiet: float = 0.25, timeout: float = 3, interval: float = 0.03):
+        self.quiet = quiet
+        self.timeout = timeout
+        self.interval = interval
+
+    def wait_stable(
+        self,
+        probe: Callable[[], Any],
+        quiet: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until `probe` keeps returning the same value.
+        :return: True if it settled, False if it was still changing at the timeout."""
+        quiet = self.quiet if quiet is None else quiet
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        last, stable_since = probe(), started
+        while True:
+            now = time.monotonic()
+            if now - stable_since >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(min(self.interval, max(0.0, deadline - now)))
+            current = probe()
+            if current != last:
+                last, stable_since = current, time.monotonic()
+
+    def wait_screen(
+        self,
+        region: Optional[Region] = None,
+        quiet: Optional[float] = None,
+        timeout: Optional[float] = None,
+        tolerance: int = 0,
+    ) -> bool:
+        """Wait until the screen `region` stops changing.
+        :param tolerance: Number of changed 32x32 pixel tiles to ignore, e.g. a blinking caret."""
+        return self.wait_stable(self.screen_probe(region, tolerance), quiet, timeout)
+
+    def wait_tree(
+        self,
+        item,
+        attributes: Sequence[str] = AX_ATTRIBUTES,
+        depth: int = 3,
+        quiet: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until the accessibility subtree of `item` stops changing."""
+        return self.wait_stable(lambda: ax_digest(item, attributes, depth), quiet, timeout)
+
+    def wait(
+        self,
+        region: Optional[Region] = None,
+        item=None,
+        quiet: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until both the screen `region` and the subtree of `item` (if given) are stable."""
+        screen = self.screen_probe(region)
+        if item is None:
+            return self.wait_stable(screen, quiet, timeout)
+        return self.wait_stable(lambda: (screen(), ax_digest(item)), quiet, timeout)
+
+    @staticmethod
+    def screen_probe(region: Optional[Region] = None, tolerance: int = 0) -> Callable[[], int]:
+        """Return a probe counting the snapshots of `region` that differ from the previous one."""
+        detector, buffer = FrameChangeDetector(), SnapshotBuffer()
+        changes = [0]
+
+        def probe() -> int:
+            tiles = detector.update(buffer.take(region))
+            if tiles is not None and int(tiles.sum()) > tolerance:
+                changes[0] += 1
+            return changes[0]
+
+        return probe
+
+
+settle = SettleDetector()
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import cv2
+import numpy
+
+from macuitest.lib.elements.ui.matching import downscale
+from macuitest.lib.elements.ui.matching import pyramid_levels
+from macuitest.lib.operating_system.env import env
+
+
+@dataclass(frozen=True)
+class Template:
+    """Decoded grayscale pattern along with the data precomputed for matching."""
+
+    image: numpy.ndarray
+    pyramid_levels: int
+    small_image: numpy.ndarray
+
+
+@dataclass
+class TemplateCacheStats:
+    """Template cache counters."""
+
+    hits: int = 0  # Served from memory.
+    disk_hits: int = 0  # Loaded (memory-mapped) from the disk store.
+    misses: int = 0  # Decoded from the screenshot file.
+
+
+class TemplateCache:
+    """Decoded screenshot storage.
+    An in-process LRU keyed by file path, mtime and size sits on top of a disk store of `.npy`
+    files keyed by file path, mtime and content hash. Arrays are memory-mapped from the store,
+    so a new test session does not decode every screenshot again."""
+
+    def __init__(self, storage: Optional[Union[str, Path]] = None, max_size: int = 1024):
+        self.storage: Optional[Path] = Path(storage) if storage else None
+        self.max_size = max_size
+        self.stats = TemplateCacheStats()
+        self.__templates: "OrderedDict[Tuple, Template]" = OrderedDict()
+
+    def load(self, path: Union[str, Path]) -> Template:
+        """Load the grayscale pattern saved at `path`."""
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Cannot find request screenshot: {path}")
+        stat = os.stat(path)
+        key = (Path(path).as_posix(), stat.st_mtime_ns, stat.st_size)
+        template = self.__templates.get(key)
+        if template is not None:
+            self.__templates.move_to_end(key)
+            self.stats.hits += 1
+            return template
+        template = self.__load(path, stat.st_mtime_ns)
+        self.__templates[key] = template
+        if len(self.__templates) > self.max_size:
+            self.__templates.popitem(last=False)
+        return template
+
+    def clear(self) -> None:
+        """Drop the in-process cache. The disk store is left intact."""
+        self.__templates.clear()
+
+    def __load(self, path: Union[str, Path], mtime: int) -> Template:
+        content = Path(path).read_bytes()
+        digest = hashlib.sha1(f"{Path(path).as_posix()}:{mtime}:".encode())
+        digest.update(hashlib.sha1(content).digest())
+        files = self.__files(digest.hexdigest())
+        if files and all(f.exists() for f in files):
+            image, small_image = (numpy.load(f, mmap_mode="r") for f in files)
+            self.stats.disk_hits += 1
+            return Template(image, pyramid_levels(image), small_image)
+        image = cv2.imdecode(numpy.frombuffer(content, numpy.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise IOError(f"Cannot not load screenshot: {path}")
+        self.stats.misses += 1
+        template = Template(image, pyramid_levels(image), downscale(image, pyramid_levels(image)))
+        if files:
+            self.__save(files[0], template.image)
+            self.__save(files[1], template.small_image)
+        return template
+
+    def __files(self, key: str) -> Optional[Tuple[Path, Path]]:
+        if self.storage is None:
+            return None
+        return self.storage.joinpath(f"{key}.npy"), self.storage.joinpath(f"{key}.small.npy")
+
+    @staticmethod
+    def __save(destination: Path, array: numpy.ndarray) -> None:
+        """Write the array next to `destination` and move it in place, so readers never see
+        a partially written file."""
+        try:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as f:
+                numpy.save(f, array)
+            os.chmod(f.name, 0o644)  # Readable by the other users of a shared cache.
+            os.replace(f.name, destination)
+        except OSError:
+            pass  # The disk store is an optimization only.
+
+
+template_cache = TemplateCache(storage=os.path.join(env.macuitest_caches, "templates"))
@@ -1,15 +1,23 @@
 from pathlib import Path
+from typing import Callable
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
-import cv2
-
 from macuitest.config.constants import Point
 from macuitest.config.constants import Region
+from macuitest.lib import aio
 from macuitest.lib.core import wait_condition
-from macuitest.lib.elements.controllers.mouse import MouseConfig
 from macuitest.lib.elements.controllers.mouse import mouse
+from macuitest.lib.elements.ui.frame_change import FrameChangeDetector
+from macuitest.lib.elements.ui.location_hints import location_hints
+from macuitest.lib.elements.ui.matching import find_matches
+from macuitest.lib.elements.ui.matching import match_template
+from macuitest.lib.elements.ui.matching import match_template_pyramid
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
 from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.elements.ui.template_cache import template_cache
 
 
 class UIElementNotFoundOnScreen(Exception):
@@ -17,12 +25,26 @@ class UIElementNotFoundOnScreen(Exception):
 
 
 class UIElement:
-    """Visible user interface element. Based on automated pattern lookup algorithm (OpenCV)."""
+    """Visible user interface element. Based on automated pattern lookup algorithm (OpenCV).
+    Set `pyramid` to search a downsampled screen first and refine candidates at full resolution.
+    Unless `hint_margin` is None, `get_center` looks the pattern up around the location
+    it was last found at before searching the whole screen."""
 
-    def __init__(self, screenshot_path: Union[str, Path], similarity: float = 0.925):
+    def __init__(
+        self,
+        screenshot_path: Union[str, Path],
+        similarity: float = 0.925,
+        pyramid: bool = False,
+        hint_margin: Optional[int] = 40,
+    ):
         self.path = screenshot_path.strip() if isinstance(screenshot_path, str) else screenshot_path
         self.similarity: float = similarity
+        self.pyramid: bool = pyramid
+        self.hint_margin: Optional[int] = hint_margin
+        self.last_location: Optional[Point] = None
         self.image, self.width, self.height = None, None, None
+        self.pyramid_levels: int = 0
+        self.__small_image = None
         self.__matches: Optional = list()
         self.__load_image()
 
@@ -43,8 +65,8 @@ class UIElement:
         self,
         x_off: int = 0,
         y_off: int = 0,
-        hold: float = MouseConfig.hold,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        pause: Optional[float] = None,
         region: Optional[Region] = None,
     ):
         center = self.get_center(region)
@@ -54,8 +76,8 @@ class UIElement:
         self,
         x_off: int = 0,
         y_off: int = 0,
-        hold: float = MouseConfig.hold,
-        pause: float = MouseConfig.pause,
+        hold: Optional[float] = None,
+        pause: Optional[float] = None,
         region: Optional[Region] = None,
     ):
         center = self.get_center(region)
@@ -65,7 +87,7 @@ class UIElement:
         self,
         x_off: int = 0,
         y_off: int = 0,
-        duration: float = MouseConfig.move,
+        duration: Optional[float] = None,
         region: Optional[Region] = None,
     ):
         center = self.get_center(region)
@@ -77,7 +99,7 @@ class UIElement:
         return False or self.wait_displayed() is not None
 
     def get_center(self, region: Optional[Region] = None):
-        match = self.wait_displayed(region=region)
+        match = self.__detect_near_last_location(region) or self.wait_displayed(region=region)
         if not match:
             raise UIElementNotFoundOnScreen(self.path)
         return Point(int(match.x + self.width / 2), int(match.y + self.height / 2))
@@ -85,10 +107,20 @@ class UIElement:
     def wait_displayed(
         self, timeout: int = 5, region: Optional[Region] = None
     ) -> Union[None, Point]:
-        return wait_condition(lambda: self.detect_on_screen(region), timeout=timeout)
+        return wait_condition(self.__watch(region), timeout=timeout)
 
     def wait_vanish(self, timeout: int = 15, region: Optional[Region] = None) -> bool:
-        return wait_condition(lambda: self.detect_on_screen(region) is None, timeout=timeout)
+        watch = self.__watch(region)
+        return wait_condition(lambda: watch() is None, timeout=timeout)
+
+    async def wait_displayed_async(
+        self, timeout: int = 5, region: Optional[Region] = None
+    ) -> Union[None, Point]:
+        return await aio.wait_condition(self.__watch(region), timeout=timeout)
+
+    async def wait_vanish_async(self, timeout: int = 15, region: Optional[Region] = None) -> bool:
+        watch = self.__watch(region)
+        return await aio.wait_condition(lambda: watch() is None, timeout=timeout)
 
     def detect_on_screen(self, region: Optional[Region] = None):
         """Locate pattern on the screen and return its center.
@@ -97,30 +129,127 @@ class UIElement:
         for computer vision applications and to accelerate the use of machine perception
         in the commercial products."""
         region = region or Region(0, 0, monitor.size.width, monitor.size.height)
-        _, similarity, _, position = cv2.minMaxLoc(
-            cv2.matchTemplate(
-                cv2.cvtColor(monitor.make_snapshot(region), cv2.COLOR_BGR2GRAY),
-                self.image,
-                cv2.TM_CCOEFF_NORMED,
-            )
+        return self.locate(monitor.make_snapshot(region, grayscale=True), region)
+
+    def find_all(
+        self,
+        region: Optional[Region] = None,
+        max_results: int = 100,
+        min_distance: Optional[int] = None,
+    ) -> List[Point]:
+        """Locate every occurrence of the pattern on the screen with a single capture.
+        :param min_distance: Minimal distance between two occurrences in screen points,
+            half of the smaller pattern side by default.
+        :return: Top left points of the occurrences in the reading order."""
+        region = region or Region(0, 0, monitor.size.width, monitor.size.height)
+        scale = 2 if monitor.is_retina else 1
+        matches = find_matches(
+            monitor.make_snapshot(region, grayscale=True),
+            self.image,
+            self.similarity,
+            max_results=max_results,
+            min_distance=None if min_distance is None else min_distance * scale,
         )
+        points = (Point(x // scale + region.x1, y // scale + region.y1) for _, (x, y) in matches)
+        return sorted(points, key=lambda p: (p.y, p.x))
+
+    def locate(self, screen, region: Region) -> Optional[Point]:
+        """Locate pattern on a grayscale snapshot of `region` taken beforehand."""
+        similarity, position = self.match(screen)
+        return self.__found(similarity, position, region)
+
+    def __found(self, similarity: float, position: Tuple[int, int], region: Region):
+        """Convert a match in `region` snapshot pixels to screen points, if it is good enough."""
         # In case of AssertionError in cv2.error:
         # `_img.size().height <= _templ.size().height && _img.size().width <= _templ.size().width`
         # You need to check that the `region` size is larger than `pattern` size.
         if round(similarity, 3) >= self.similarity:
             denominator = 2 if monitor.is_retina else 1
-            return Point(
-                (position[0] + region.x1) // denominator, (position[1] + region.y1) // denominator
+            self.last_location = Point(
+                position[0] // denominator + region.x1, position[1] // denominator + region.y1
             )
+            location_hints.set(self.path, monitor.size, self.last_location)
+            return self.last_location
+
+    def __watch(self, region: Optional[Region] = None) -> Callable[[], Optional[Point]]:
+        """Build a pattern lookup for polling. While the screen area stays pixel-identical
+        the previous result is reused; when it changes only the changed tiles are searched
+        for a pattern that was not displayed, and a displayed one is re-checked only if
+        the change touches it. The snapshots of the screen area share one buffer."""
+        region = region or Region(0, 0, monitor.size.width, monitor.size.height)
+        detector, previous = FrameChangeDetector(), dict(point=None, footprint=None, frame=0)
+        buffer = SnapshotBuffer()
+
+        def detect() -> Optional[Point]:
+            if monitor.is_capturing:  # Sleep until the background capture takes a new frame.
+                monitor.wait_new_frame(after=previous["frame"], timeout=0.5)
+                previous["frame"] = monitor.frame_count
+            screen = buffer.take(region)
+            tiles = detector.update(screen)
+            changed = (0, 0, *screen.shape[::-1]) if tiles is None else detector.changed_area(tiles)
+            if changed is None:
+                return previous["point"]
+            if previous["point"] is None:
+                previous["point"], previous["footprint"] = self.__locate_in(screen, region, changed)
+            elif _overlap(previous["footprint"], changed):
+                previous["point"], previous["footprint"] = self.__locate_in(screen, region)
+            return previous["point"]
+
+        return detect
+
+    def __locate_in(self, screen, region: Region, area: Optional[Tuple[int, ...]] = None):
+        """Locate pattern in the part of `screen` where a match may overlap the `area`.
+        :return: Match position in screen points (if found) and its footprint in `screen` pixels."""
+        height, width = self.image.shape
+        x1, y1, x2, y2 = (0, 0, screen.shape[1], screen.shape[0])
+        if area is not None:
+            x1, y1 = max(x1, area[0] - width), max(y1, area[1] - height)
+            x2, y2 = min(x2, area[2] + width), min(y2, area[3] + height)
+        similarity, (x, y) = self.match(screen[y1:y2, x1:x2])
+        x, y = x + x1, y + y1
+        return self.__found(similarity, (x, y), region), (x, y, x + width, y + height)
+
+    def __detect_near_last_location(self, region: Optional[Region] = None) -> Optional[Point]:
+        """Look the pattern up in a small neighbourhood of the location it was last found at."""
+        last = self.last_location or location_hints.get(self.path, monitor.size)
+        if self.hint_margin is None or last is None:
+            return None
+        bounds = region or Region(0, 0, monitor.size.width, monitor.size.height)
+        hint = Region(
+            max(bounds.x1, last.x - self.hint_margin),
+            max(bounds.y1, last.y - self.hint_margin),
+            min(bounds.x2, int(last.x + self.width + self.hint_margin)),
+            min(bounds.y2, int(last.y + self.height + self.hint_margin)),
+        )
+        if hint.x2 - hint.x1 < self.width or hint.y2 - hint.y1 < self.height:
+            return None
+        match = self.detect_on_screen(hint)
+        if match is None:
+            location_hints.stats.misses += 1
+        else:
+            location_hints.stats.hits += 1
+        return match
+
+    def match(self, screen):
+        """Find the best match of the pattern on a grayscale `screen` image.
+        :return: Similarity score and top left (x, y) position of the match in `screen` pixels."""
+        if self.pyramid:
+            return match_template_pyramid(
+                screen, self.image, self.similarity, self.pyramid_levels, self.__small_image
+            )
+        return match_template(screen, self.image)
 
     def __load_image(self) -> None:
-        """Load the image from the disk."""
-        if not Path(self.path).exists():
-            raise FileNotFoundError(f"Cannot find request screenshot: {self.path}")
-        image = cv2.imread(self.path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise IOError(f"Cannot not load screenshot: {self.path}")
-        height, width = image.shape
+        """Load the image from the disk (or the template cache)."""
+        template = template_cache.load(self.path)
+        height, width = template.image.shape
         if monitor.is_retina:
             height, width = height / 2, width / 2
-        self.image, self.width, self.height = image, width, height
+        self.image, self.width, self.height = template.image, width, height
+        self.pyramid_levels = template.pyramid_levels
+        self.__small_image = template.small_image
+
+
+def _overlap(a: Tuple[int, ...], b: Tuple[int, ...]) -> bool:
+    """Check whether two (x1, y1, x2, y2) boxes intersect."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
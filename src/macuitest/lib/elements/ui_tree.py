@@ -0,0 +1,167 @@
+"""Immutable snapshots of UI element subtrees, taken with a single AppleScript call."""
+import math
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from macuitest.config.constants import Frame
+from macuitest.config.constants import Point
+
+ATTRIBUTES = ("AXRole", "AXTitle", "AXValue", "AXDescription", "AXPosition", "AXSize")
+_MISSING_VALUE = b"msng"
+
+# Walks the subtree in System Events: every node is {attribute values, child nodes}.
+SNAPSHOT_SCRIPT = """on walk(_element, _attributes, _depth)
+tell application "System Events"
+set _values to {}
+repeat with _index from 1 to count of _attributes
+try
+set end of _values to value of attribute (item _index of _attributes) of _element
+on error
+set end of _values to missing value
+end try
+end repeat
+set _children to {}
+if _depth > 0 then
+try
+set _elements to UI elements of _element
+on error
+set _elements to {}
+end try
+repeat with _child in _elements
+set end of _children to my walk(contents of _child, _attributes, _depth - 1)
+end repeat
+end if
+end tell
+return {_values, _children}
+end walk
+
+on snapshot(_attributes, _depth)
+tell application "System Events"
+tell application process "%(process)s"
+if not (exists %(locator)s) then return missing value
+set _root to %(locator)s
+end tell
+end tell
+return walk(_root, _attributes, _depth)
+end snapshot"""
+
+
+@dataclass(frozen=True)
+class UINode:
+    """A UI element as it was when the snapshot was taken, along with its descendants."""
+
+    attributes: Tuple[Tuple[str, Any], ...]
+    children: Tuple["UINode", ...] = ()
+
+    def __repr__(self):
+        name = self.title or self.value or ""
+        return f'<UINode {self.role} "{name}", children={len(self.children)}>'
+
+    def get(self, attribute: str, default: Any = None) -> Any:
+        return next((value for name, value in self.attributes if name == attribute), default)
+
+    @property
+    def role(self) -> Optional[str]:
+        return self.get("AXRole")
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.get("AXTitle")
+
+    @property
+    def value(self) -> Any:
+        return self.get("AXValue")
+
+    @property
+    def description(self) -> Optional[str]:
+        return self.get("AXDescription")
+
+    @property
+    def frame(self) -> Optional[Frame]:
+        position, size = self.get("AXPosition"), self.get("AXSize")
+        if position is None or size is None:
+            return None
+        x1, y1, width, height = (math.floor(x) for x in (*position, *size))
+        center = Point(int(x1 + width / 2), int(y1 + height / 2))
+        return Frame(x1, y1, x1 + width, y1 + height, center, width, height)
+
+    def walk(self) -> Iterator["UINode"]:
+        """The node and all its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def find_all(
+        self, predicate: Optional[Callable[["UINode"], bool]] = None, **criteria
+    ) -> List["UINode"]:
+        """Nodes of the subtree matching every criterion, e.g. `find_all(role="AXRow")`.
+        Criteria are `role`, `title`, `value`, `description` or attribute names; a criterion is
+        either the expected value or a callable checking it."""
+        return [node for node in self.walk() if node.__matches(predicate, criteria)]
+
+    def find(
+        self, predicate: Optional[Callable[["UINode"], bool]] = None, **criteria
+    ) -> Optional["UINode"]:
+        """The first node matching the criteria of `find_all`, None if there is none."""
+        return next((n for n in self.walk() if n.__matches(predicate, criteria)), None)
+
+    def count(self, predicate: Optional[Callable[["UINode"], bool]] = None, **criteria) -> int:
+        return sum(1 for node in self.walk() if node.__matches(predicate, criteria))
+
+    def __matches(self, predicate: Optional[Callable[["UINode"], bool]], criteria: dict) -> bool:
+        if predicate is not None and not predicate(self):
+            return False
+        for name, expected in criteria.items():
+            actual = getattr(self, name) if name in _SHORTCUTS else self.get(name)
+            if not (expected(actual) if callable(expected) else actual == expected):
+                return False
+        return True
+
+    @classmethod
+    def decode(cls, raw: Sequence, attributes: Sequence[str] = ATTRIBUTES) -> "UINode":
+        """Build the tree out of the `{values, children}` lists the snapshot script returns."""
+        values, children = raw
+        return cls(
+            tuple(zip(attributes, (_freeze(value) for value in values))),
+            tuple(cls.decode(child, attributes) for child in children),
+        )
+
+
+_SHORTCUTS = ("role", "title", "value", "description")
+
+
+def _freeze(value: Any) -> Any:
+    """Missing values become None, lists become tuples and records (e.g. object specifiers)
+    become tuples of (key, value) pairs sorted by key."""
+    if getattr(value, "code", None) == _MISSING_VALUE:
+        return None
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        pairs = ((key, _freeze(item)) for key, item in value.items())
+        return tuple(sorted(pairs, key=lambda pair: str(pair[0])))
+    return value
+
+
+def snapshot_tree(
+    locator: str, process: str, attributes: Sequence[str] = ATTRIBUTES, depth: int = 3
+) -> Optional[UINode]:
+    """Read `attributes` of the element at `locator` and of its descendants `depth` levels down
+    in one AppleScript call. Further queries run on the snapshot without any IPC:
+
+        table = snapshot_tree('table 1 of scroll area 1 of window 1', "Finder", depth=3)
+        names = [cell.value for cell in table.find_all(role="AXTextField")]
+
+    :return: None if there is no such element."""
+    from macuitest.lib.applescript_lib.applescript_wrapper import as_wrapper
+
+    as_wrapper.flush()
+    library = as_wrapper.libraries.get(SNAPSHOT_SCRIPT % dict(locator=locator, process=process))
+    raw = library.call("snapshot", list(attributes), depth)
+    return None if _freeze(raw) is None else UINode.decode(raw, attributes)
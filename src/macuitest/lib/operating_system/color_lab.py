@@ -0,0 +1,127 @@
+"""Perceptual color classification: CIELAB colors compared with the CIE94 color difference."""
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import cv2
+import numpy
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.lib.operating_system.color_table import Palette
+
+_CHUNK = 4096  # Colors compared against the palette at once, bounds the temporary arrays.
+_SAMPLE = 20000  # Pixels k-means is fitted on, the rest are assigned to the nearest cluster.
+
+
+def to_lab(pixels: numpy.ndarray) -> numpy.ndarray:
+    """Convert an (..., 3) RGB array to float32 CIELAB: L in [0, 100], a and b in ~[-128, 127]."""
+    rgb = numpy.asarray(pixels, dtype=numpy.float32).reshape(-1, 1, 3) / 255
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2Lab).reshape(numpy.shape(pixels))
+
+
+def delta_e(sample: numpy.ndarray, reference: numpy.ndarray) -> numpy.ndarray:
+    """CIE94 difference (graphic arts weights) of (..., 3) CIELAB arrays, broadcast together.
+    Unlike RGB or CIE76 distances it tolerates chroma shifts of saturated colors more than
+    shifts of greys and pastels, which is closer to how the colors are perceived."""
+    dl = sample[..., 0] - reference[..., 0]
+    c1 = numpy.hypot(sample[..., 1], sample[..., 2])
+    c2 = numpy.hypot(reference[..., 1], reference[..., 2])
+    dc = c1 - c2
+    da, db = sample[..., 1] - reference[..., 1], sample[..., 2] - reference[..., 2]
+    dh_squared = numpy.maximum(da * da + db * db - dc * dc, 0)
+    return numpy.sqrt(dl * dl + (dc / (1 + 0.045 * c1)) ** 2 + dh_squared / (1 + 0.015 * c1) ** 2)
+
+
+class LabColorTable:
+    """Map RGB colors to the index of the perceptually closest `palette` color.
+    Answers are remembered per 24-bit color, so repeated colors of a UI cost nothing."""
+
+    def __init__(self, palette: Sequence[Tuple[str, int, int, int]]):
+        self.palette: Palette = tuple(tuple(color) for color in palette)
+        if not self.palette:
+            raise ValueError("Palette is empty")
+        self.names = tuple(name for name, *_ in self.palette)
+        self.lab = to_lab(numpy.array([rgb for _, *rgb in self.palette], dtype=numpy.uint8))
+        self.__dtype = numpy.uint8 if len(self.palette) < 255 else numpy.uint16
+        self.__known: Optional[numpy.ndarray] = None
+
+    def __repr__(self):
+        return f"<LabColorTable colors={len(self.palette)}>"
+
+    def lookup(self, pixels: numpy.ndarray) -> numpy.ndarray:
+        """Map every pixel of an (..., 3) RGB array to the index of its closest palette color."""
+        if self.__known is None:
+            self.__known = numpy.full(1 << 24, len(self.palette), dtype=self.__dtype)
+        rgb = numpy.asarray(pixels, dtype=numpy.uint8).reshape(-1, 3)
+        keys = rgb[:, 0].astype(numpy.intp) << 16 | rgb[:, 1].astype(numpy.intp) << 8 | rgb[:, 2]
+        indices = self.__known.take(keys)
+        unknown = numpy.unique(keys[indices == len(self.palette)])
+        if len(unknown):
+            colors = numpy.stack((unknown >> 16, unknown >> 8 & 0xFF, unknown & 0xFF), axis=1)
+            self.__known[unknown] = self.closest(colors.astype(numpy.uint8))
+            indices = self.__known.take(keys)
+        return indices.astype(numpy.intp).reshape(numpy.shape(pixels)[:-1])
+
+    def closest(self, colors: numpy.ndarray) -> numpy.ndarray:
+        """Compare the (N, 3) RGB `colors` against the palette."""
+        lab = to_lab(colors)
+        nearest = numpy.empty(len(colors), dtype=numpy.intp)
+        for start in range(0, len(colors), _CHUNK):
+            distances = delta_e(lab[start : start + _CHUNK, None, :], self.lab[None])
+            nearest[start : start + _CHUNK] = distances.argmin(axis=1)
+        return nearest
+
+
+class LabColorTables:
+    """Perceptual color tables per palette."""
+
+    def __init__(self):
+        self.__tables: Dict[Palette, LabColorTable] = dict()
+
+    def get(self, palette: Sequence[Tuple[str, int, int, int]] = CSS3_COLORS) -> LabColorTable:
+        palette = tuple(tuple(color) for color in palette)
+        if palette not in self.__tables:
+            self.__tables[palette] = LabColorTable(palette)
+        return self.__tables[palette]
+
+    def clear(self) -> None:
+        self.__tables.clear()
+
+
+def dominant_colors(
+    pixels: numpy.ndarray,
+    count: int = 3,
+    ignore_colors: Optional[Tuple[str, ...]] = None,
+    palette: Sequence = CSS3_COLORS,
+    attempts: int = 3,
+) -> List[Tuple[str, float]]:
+    """Cluster the RGB `pixels` into `count` colors with k-means in CIELAB and name the clusters.
+    Return the names with the percentage of pixels they cover, most common first. Clusters of
+    the same name are merged, pixels closest to `ignore_colors` are left out."""
+    table = lab_tables.get(palette)
+    rgb = numpy.asarray(pixels, dtype=numpy.uint8).reshape(-1, 3)
+    if ignore_colors:
+        ignored = [i for i, name in enumerate(table.names) if name in ignore_colors]
+        rgb = rgb[~numpy.isin(table.lookup(rgb), ignored)]
+    if not len(rgb):
+        return list()
+    lab = to_lab(rgb)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.5)
+    keys = rgb[:, 0].astype(numpy.int32) << 16 | rgb[:, 1].astype(numpy.int32) << 8 | rgb[:, 2]
+    count = min(count, len(numpy.unique(keys)))
+    sample = lab
+    if len(lab) > _SAMPLE:
+        sample = lab[numpy.random.default_rng(0).choice(len(lab), _SAMPLE, replace=False)]
+    _, _, centers = cv2.kmeans(sample, count, None, criteria, attempts, cv2.KMEANS_PP_CENTERS)
+    labels = numpy.square(lab[:, None, :] - centers[None]).sum(axis=2).argmin(axis=1)
+    distances = delta_e(centers[:, None, :], table.lab[None])
+    names = [table.names[i] for i in distances.argmin(axis=1)]
+    shares: Dict[str, float] = dict()
+    for name, size in zip(names, numpy.bincount(labels, minlength=count)):
+        shares[name] = shares.get(name, 0.0) + float(size) * 100 / len(rgb)
+    return sorted(shares.items(), key=lambda share: share[1], reverse=True)
+
+
+lab_tables = LabColorTables()
@@ -1,42 +1,107 @@
 """Implements a basic color meter. It finds the value of a colour on given coordinates."""
-import multiprocessing
-from collections import Counter
+from typing import Iterable
+from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 import cv2
+import numpy
 
 from macuitest.config.colors import CSS3_COLORS
 from macuitest.config.constants import Point
+from macuitest.config.constants import Region
 from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.operating_system.color_lab import dominant_colors
+from macuitest.lib.operating_system.color_lab import lab_tables
+from macuitest.lib.operating_system.color_table import color_tables
+
+ENGINES = {"rgb": color_tables, "lab": lab_tables}
 
 
 def get_most_common_color(
-    x1: int, y1: int, x2: int, y2: int, ignore_colors: Optional[Tuple[str, ...]] = None
+    x1: int,
+    y1: int,
+    x2: int,
+    y2: int,
+    ignore_colors: Optional[Tuple[str, ...]] = None,
+    palette: Sequence = CSS3_COLORS,
+    engine: str = "rgb",
 ) -> str:
-    """Get a color name that is the most common to a specific screen area."""
-    pixels = cv2.cvtColor(monitor.make_snapshot(), cv2.COLOR_BGR2RGB)
-    with multiprocessing.Pool() as pool:
-        colors = pool.map(
-            get_closest_color, list(pixels[y, x] for x in range(x1, x2) for y in range(y1, y2))
-        )
-    if ignore_colors:
-        colors = (c for c in colors if c not in ignore_colors)
-    return Counter(colors).most_common()[0][0]
-
-
-def get_color(point: Point) -> str:
+    """Get a color name that is the most common to a specific screen area.
+    Only the area is captured; on Retina displays all of its pixels are taken into account."""
+    pixels = capture_rgb(Region(x1, y1, x2, y2))
+    return most_common_color(pixels, ignore_colors, palette, engine)
+
+
+def get_dominant_colors(
+    x1: int,
+    y1: int,
+    x2: int,
+    y2: int,
+    count: int = 3,
+    ignore_colors: Optional[Tuple[str, ...]] = None,
+    palette: Sequence = CSS3_COLORS,
+) -> List[Tuple[str, float]]:
+    """Get up to `count` names of the colors dominating a specific screen area,
+    with the percentage of the area each one covers."""
+    return dominant_colors(capture_rgb(Region(x1, y1, x2, y2)), count, ignore_colors, palette)
+
+
+def get_color(point: Point, palette: Sequence = CSS3_COLORS, engine: str = "rgb") -> str:
     """Get a color name of the given pixel."""
-    return get_closest_color(
-        cv2.cvtColor(monitor.make_snapshot(), cv2.COLOR_BGR2RGB)[point.y, point.x]
-    )
+    return get_colors((point,), palette, engine)[0]
+
 
+def get_colors(
+    points: Iterable[Point], palette: Sequence = CSS3_COLORS, engine: str = "rgb"
+) -> List[str]:
+    """Get color names of several pixels, e.g. status indicators, from one capture
+    of the smallest area containing them all."""
+    points = list(points)
+    if not points:
+        return list()
+    x1, y1 = min(p.x for p in points), min(p.y for p in points)
+    x2, y2 = max(p.x for p in points) + 1, max(p.y for p in points) + 1
+    pixels = capture_rgb(Region(x1, y1, x2, y2))
+    scale = monitor.source.scale
+    probes = numpy.array([pixels[(p.y - y1) * scale, (p.x - x1) * scale] for p in points])
+    table = ENGINES[engine].get(palette)
+    return [table.names[i] for i in table.lookup(probes)]
 
-def get_closest_color(pixel) -> str:
-    """Calculate RGB difference between `pixel` and every CSS3_COLOR
+
+def capture_rgb(region: Region) -> numpy.ndarray:
+    """Capture just the screen `region` (in points) as an RGB image."""
+    region = Region(*(int(i) for i in (region.x1, region.y1, region.x2, region.y2)))
+    return cv2.cvtColor(monitor.make_snapshot(region), cv2.COLOR_BGRA2RGB)
+
+
+def get_closest_color(pixel, palette: Sequence = CSS3_COLORS) -> str:
+    """Calculate RGB difference between `pixel` and every `palette` color (CSS3_COLORS)
     and return name of the color with the minimal difference."""
-    min_colours = dict()
-    pr, pg, pb = pixel
-    for name, cr, cg, cb in CSS3_COLORS:
-        min_colours[abs(cr - pr) + abs(cg - pg) + abs(cb - pb)] = name
-    return min_colours[min(min_colours)]
+    table = color_tables.get(palette)
+    return table.names[table.lookup(numpy.asarray(pixel).reshape(1, 3))[0]]
+
+
+def most_common_color(
+    pixels: numpy.ndarray,
+    ignore_colors: Optional[Tuple[str, ...]] = None,
+    palette: Sequence = CSS3_COLORS,
+    engine: str = "rgb",
+) -> str:
+    """Get a name of the color most of the RGB `pixels` are closest to.
+    Ties go to the color met first scanning the area column by column.
+    :param engine: "rgb" compares RGB values, "lab" compares perceived colors (CIE94)."""
+    table = ENGINES[engine].get(palette)
+    indices = table.lookup(pixels)
+    counts = numpy.bincount(indices.ravel(), minlength=len(table.names))
+    for name in ignore_colors or ():
+        if name in table.names:
+            counts[table.names.index(name)] = 0
+    if not counts.any():
+        raise IndexError("No colors left to choose from")
+    leaders = numpy.flatnonzero(counts == counts.max())
+    if len(leaders) > 1:
+        column_major = indices.T.ravel()
+        leaders = sorted(leaders, key=lambda i: numpy.argmax(column_major == i))
+    return table.names[leaders[0]]
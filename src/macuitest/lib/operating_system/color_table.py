@@ -0,0 +1,176 @@
+"""Nearest palette color lookup tables for whole images."""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import numpy
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.lib.operating_system.env import env
+
+Palette = Tuple[Tuple[str, int, int, int], ...]
+
+_CHUNK = 8192  # Colors compared against the palette at once, bounds the temporary arrays.
+
+
+def css3_palette(names: Iterable[str]) -> Palette:
+    """Pick the named CSS3 colors, e.g. `css3_palette(Colors.blue)`."""
+    names = set(names)
+    return tuple(color for color in CSS3_COLORS if color[0] in names)
+
+
+@dataclass
+class ColorTableStats:
+    """Color table counters."""
+
+    pixels: int = 0  # Pixels looked up.
+    refined: int = 0  # Pixels of the buckets shared by several colors, compared exactly.
+
+
+class ColorTable:
+    """Map RGB colors to the index of the closest (by RGB difference) `palette` color.
+    Colors are quantized to `bits` per channel. The table stores the closest palette color
+    of every bucket that has a single one, the pixels of the other buckets are compared
+    against the palette exactly. The result is the same as comparing every pixel."""
+
+    def __init__(self, palette: Sequence[Tuple[str, int, int, int]], bits: int = 6, storage=None):
+        self.palette: Palette = tuple(tuple(color) for color in palette)
+        if not self.palette:
+            raise ValueError("Palette is empty")
+        self.names = tuple(name for name, *_ in self.palette)
+        self.bits = bits
+        self.stats = ColorTableStats()
+        # Reversed, so that `argmin` picks the last of equally close colors.
+        self.__rgb = numpy.array([rgb for _, *rgb in reversed(self.palette)], dtype=numpy.int32)
+        self.__dtype = numpy.uint8 if len(self.palette) < 255 else numpy.uint16
+        self.__storage: Optional[Path] = Path(storage) if storage else None
+        self.__table: Optional[numpy.ndarray] = None
+        self.__refined: Optional[numpy.ndarray] = None  # Exact answers per 24-bit color.
+
+    def __repr__(self):
+        return f"<ColorTable colors={len(self.palette)}, bits={self.bits}>"
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1(f"{self.bits}:{self.palette!r}".encode()).hexdigest()
+
+    @property
+    def table(self) -> numpy.ndarray:
+        """Flat table of the palette indices per bucket, `len(palette)` marks mixed buckets."""
+        if self.__table is None:
+            self.__table = self.__load()
+        return self.__table
+
+    def lookup(self, pixels: numpy.ndarray) -> numpy.ndarray:
+        """Map every pixel of an (..., 3) RGB array to the index of its closest palette color."""
+        rgb = numpy.asarray(pixels, dtype=numpy.uint8).reshape(-1, 3)
+        shift, bits = 8 - self.bits, self.bits
+        buckets = (rgb[:, 0].astype(numpy.intp) >> shift) << bits * 2
+        buckets |= (rgb[:, 1] >> shift).astype(numpy.intp) << bits
+        buckets |= rgb[:, 2] >> shift
+        indices = self.table.take(buckets).astype(numpy.intp)
+        mixed = numpy.flatnonzero(indices == len(self.palette))
+        if len(mixed):
+            indices[mixed] = self.__refine(rgb[mixed])
+        self.stats.pixels += len(rgb)
+        self.stats.refined += len(mixed)
+        return indices.reshape(numpy.shape(pixels)[:-1])
+
+    def __refine(self, rgb: numpy.ndarray) -> numpy.ndarray:
+        """Look the colors of mixed buckets up exactly, remembering the answers."""
+        if self.__refined is None:
+            self.__refined = numpy.full(1 << 24, len(self.palette), dtype=self.__dtype)
+        keys = rgb[:, 0].astype(numpy.intp) << 16 | rgb[:, 1].astype(numpy.intp) << 8 | rgb[:, 2]
+        indices = self.__refined.take(keys)
+        unknown = numpy.unique(keys[indices == len(self.palette)])
+        if len(unknown):
+            colors = numpy.stack((unknown >> 16, unknown >> 8 & 0xFF, unknown & 0xFF), axis=1)
+            self.__refined[unknown] = self.closest(colors)
+            indices = self.__refined.take(keys)
+        return indices
+
+    def closest(self, pixels: numpy.ndarray) -> numpy.ndarray:
+        """Compare every pixel of an (..., 3) RGB array against the palette.
+        The distances are computed once per distinct color."""
+        rgb = numpy.asarray(pixels, dtype=numpy.int32).reshape(-1, 3)
+        keys = rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]
+        colors, inverse = numpy.unique(keys, return_inverse=True)
+        colors = numpy.stack((colors >> 16, colors >> 8 & 0xFF, colors & 0xFF), axis=1)
+        nearest = numpy.empty(len(colors), dtype=numpy.intp)
+        for start in range(0, len(colors), _CHUNK):
+            distances = numpy.abs(colors[start : start + _CHUNK, None, :] - self.__rgb).sum(axis=2)
+            nearest[start : start + _CHUNK] = len(self.__rgb) - 1 - distances.argmin(axis=1)
+        return nearest[inverse].reshape(numpy.shape(pixels)[:-1])
+
+    def __load(self) -> numpy.ndarray:
+        path = self.__storage.joinpath(f"{self.key}.npy") if self.__storage else None
+        if path is not None and path.exists():
+            try:
+                return numpy.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                pass  # Damaged, build it again.
+        table = self.__build()
+        if path is not None:
+            self.__save(path, table)
+        return table
+
+    def __build(self) -> numpy.ndarray:
+        """A bucket gets a palette color when the farthest point of the bucket from that color
+        is still closer than the nearest point of the bucket to any other color."""
+        size, count = 1 << self.bits, len(self.__rgb)
+        low = numpy.arange(size)[:, None] << 8 - self.bits
+        high = low + (1 << 8 - self.bits) - 1
+        # Per channel distances of (bucket, palette color) pairs: shape (channel, bucket, color).
+        channels = self.__rgb.T[:, None, :]
+        near = numpy.maximum(numpy.maximum(low - channels, channels - high), 0)
+        far = numpy.maximum(numpy.abs(low - channels), numpy.abs(high - channels))
+        table = numpy.empty((size, size, size), dtype=self.__dtype)
+        for r in range(size):
+            nearest = near[0, r] + near[1][:, None, :] + near[2][None, :, :]
+            farthest = far[0, r] + far[1][:, None, :] + far[2][None, :, :]
+            best = farthest.argmin(axis=2)[..., None]
+            numpy.put_along_axis(nearest, best, numpy.iinfo(numpy.int32).max, axis=2)
+            single = numpy.take_along_axis(farthest, best, axis=2) < nearest.min(axis=2)[..., None]
+            table[r] = numpy.where(single[..., 0], count - 1 - best[..., 0], count)
+        return table.ravel()
+
+    @staticmethod
+    def __save(destination: Path, table: numpy.ndarray) -> None:
+        try:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as f:
+                numpy.save(f, table)
+            os.chmod(f.name, 0o644)  # Readable by the other users of a shared cache.
+            os.replace(f.name, destination)  # Concurrent sessions never read a partial table.
+        except OSError:
+            pass
+
+
+class ColorTables:
+    """Color tables per palette, built once and kept in `storage` for the next sessions."""
+
+    def __init__(self, storage: Optional[Union[str, Path]] = None, bits: int = 6):
+        self.storage = storage
+        self.bits = bits
+        self.__tables: Dict[Palette, ColorTable] = dict()
+
+    def get(self, palette: Sequence[Tuple[str, int, int, int]] = CSS3_COLORS) -> ColorTable:
+        palette = tuple(tuple(color) for color in palette)
+        if palette not in self.__tables:
+            self.__tables[palette] = ColorTable(palette, bits=self.bits, storage=self.storage)
+        return self.__tables[palette]
+
+    def clear(self) -> None:
+        """Drop the tables loaded into the process. The stored files are left intact."""
+        self.__tables.clear()
+
+
+color_tables = ColorTables(storage=os.path.join(env.macuitest_caches, "colors"))
@@ -145,6 +145,11 @@ class Env:
     def user_caches(self) -> str:
         return os.path.join(self.user_lib, "Caches")
 
+    @property
+    def macuitest_caches(self) -> str:
+        """Folder for data macuitest derives once and reuses across sessions."""
+        return os.environ.get("MACUITEST_CACHE", os.path.join(self.user_caches, "macuitest"))
+
     @property
     def user_diag_reports(self) -> str:
         return os.path.join(self.user_lib, "Logs", "DiagnosticReports")
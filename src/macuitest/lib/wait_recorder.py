@@ -0,0 +1,139 @@
+"""Opt-in statistics of the `wait_condition` calls per call site."""
+import atexit
+import csv
+import json
+import threading
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from macuitest.lib import core
+from macuitest.lib.core import WaitStats
+
+# Upper bounds (seconds) of the wait duration histogram bins; the last bin is open-ended.
+BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+@dataclass
+class WaitSite:
+    """Aggregated waits of one call site."""
+
+    label: str
+    timeout: float = 0.0  # The longest timeout the site waited with.
+    calls: int = 0
+    timeouts: int = 0
+    attempts: int = 0  # Predicate invocations.
+    exceptions: int = 0  # Swallowed exceptions.
+    total_time: float = 0.0
+    max_time: float = 0.0
+    success_time: float = 0.0  # Summed time to success of the successful calls.
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    @property
+    def timeout_rate(self) -> float:
+        return self.timeouts / self.calls if self.calls else 0.0
+
+    @property
+    def mean_time_to_success(self) -> Optional[float]:
+        successes = self.calls - self.timeouts
+        return self.success_time / successes if successes else None
+
+    def add(self, timeout: float, stats: WaitStats) -> None:
+        self.timeout = max(self.timeout, timeout)
+        self.calls += 1
+        self.timeouts += not stats.succeeded
+        self.attempts += stats.attempts
+        self.exceptions += stats.exceptions
+        self.total_time += stats.elapsed
+        self.max_time = max(self.max_time, stats.elapsed)
+        self.success_time += stats.elapsed if stats.succeeded else 0.0
+        self.histogram[sum(stats.elapsed > bound for bound in BUCKETS)] += 1
+
+
+class WaitRecorder:
+    """Record every `wait_condition` call while started, e.g. for a whole test session:
+
+        wait_recorder.start(export_to="waits.csv")
+
+    Sites are labeled `module:function:line` of the calling code outside of the library, plus
+    the library function it went through, unless the wait has a `label`.
+    `report` lists the sites that cost the most time; waits that routinely run to their full
+    timeout stand out by their `timeout_rate`."""
+
+    def __init__(self):
+        self.sites: Dict[str, WaitSite] = dict()
+        self.__lock = threading.Lock()
+        self.__export_to: Optional[Path] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    @property
+    def is_recording(self) -> bool:
+        return core.wait_recorder is self
+
+    def start(self, export_to: Optional[Union[str, Path]] = None) -> None:
+        """Start recording. With `export_to` the records are saved there (as CSV if the file
+        name ends with .csv, as JSON otherwise) when the process exits."""
+        core.wait_recorder = self
+        if export_to is not None:
+            if self.__export_to is None:
+                atexit.register(self.__export)
+            self.__export_to = Path(export_to)
+
+    def stop(self) -> None:
+        if self.is_recording:
+            core.wait_recorder = None
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.sites.clear()
+
+    def record(self, label: str, timeout: float, stats: WaitStats) -> None:
+        with self.__lock:
+            if label not in self.sites:
+                self.sites[label] = WaitSite(label)
+            self.sites[label].add(timeout, stats)
+
+    def report(self, top: int = 20) -> List[WaitSite]:
+        """The `top` sites by the total time spent waiting."""
+        with self.__lock:
+            sites = sorted(self.sites.values(), key=lambda site: site.total_time, reverse=True)
+        return sites[:top]
+
+    def to_json(self, path: Union[str, Path]) -> Path:
+        sites = self.report(len(self.sites))
+        records = [dict(asdict(site), timeout_rate=site.timeout_rate) for site in sites]
+        Path(path).write_text(json.dumps({"buckets": BUCKETS, "sites": records}, indent=2))
+        return Path(path)
+
+    def to_csv(self, path: Union[str, Path]) -> Path:
+        columns = ("label", "timeout", "calls", "timeouts", "attempts", "exceptions")
+        columns += ("total_time", "max_time", "success_time")
+        bins = [f"<={bound}s" for bound in BUCKETS] + [f">{BUCKETS[-1]}s"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns + tuple(bins))
+            for site in self.report(len(self.sites)):
+                writer.writerow([getattr(site, column) for column in columns] + site.histogram)
+        return Path(path)
+
+    def __export(self) -> None:
+        if self.__export_to is not None:
+            if self.__export_to.suffix.lower() == ".csv":
+                self.to_csv(self.__export_to)
+            else:
+                self.to_json(self.__export_to)
+
+
+wait_recorder = WaitRecorder()
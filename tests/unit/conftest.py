@@ -0,0 +1,12 @@
+import pytest
+
+from macuitest.lib.operating_system.color_table import color_tables
+
+
+@pytest.fixture
+def color_tables_storage(tmp_path, monkeypatch):
+    """Keep the color tables built by the tests out of the user's cache folder."""
+    monkeypatch.setattr(color_tables, "storage", tmp_path)
+    color_tables.clear()
+    yield
+    color_tables.clear()
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from macuitest.lib import aio
+from macuitest.lib.core import WaitStats
+
+
+def test_wait_condition_runs_blocking_predicates_concurrently():
+    def ready_after(seconds):
+        ready = time.monotonic() + seconds
+        return lambda: time.sleep(0.01) or time.monotonic() >= ready and seconds
+
+    async def race():
+        waits = [aio.wait_condition(ready_after(s), timeout=1) for s in (0.1, 0.2, 0.3)]
+        return await asyncio.gather(*waits)
+
+    started = time.monotonic()
+    assert asyncio.run(race()) == [0.1, 0.2, 0.3]
+    assert time.monotonic() - started < 0.5
+
+
+def test_wait_condition_with_coroutine_predicate():
+    async def never():
+        return None
+
+    stats = WaitStats()
+    assert asyncio.run(aio.wait_condition(never, timeout=0.05, wait_stats=stats)) is False
+    assert stats.attempts > 2 and not stats.succeeded
+
+
+def test_to_async():
+    assert asyncio.run(aio.to_async(divmod)(7, 2)) == (3, 1)
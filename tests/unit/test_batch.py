@@ -0,0 +1,114 @@
+import pytest
+
+from macuitest.lib.applescript_lib.batch import CommandBatch
+from macuitest.lib.applescript_lib.batch import CommandQueue
+from macuitest.lib.applescript_lib.batch import batch_script
+from macuitest.lib.elements.controllers.input_events import input_events
+
+
+def test_batch_script():
+    batch = CommandBatch()
+    command = batch.add('set value of text field 1 to arg1', ('Bobby "Tables"',))
+    batch.add("click button 1")
+    assert command.origin.startswith(f"{__name__}:test_batch_script:")
+    commands = batch.take()
+    assert len(batch) == 0 and len(commands) == 2
+    assert batch_script(commands).splitlines() == [
+        "on run_batch(_args)",
+        "set _errors to {}",
+        "try",
+        "set {arg1} to item 1 of _args",
+        "set value of text field 1 to arg1",
+        "on error _message number _number",
+        "set end of _errors to {1, _message, _number}",
+        "end try",
+        "try",
+        "click button 1",
+        "on error _message number _number",
+        "set end of _errors to {2, _message, _number}",
+        "end try",
+        "return _errors",
+        "end run_batch",
+    ]
+
+
+class Failed(Exception):
+    def __init__(self, failures):
+        super().__init__(failures)
+        self.failures = failures
+
+
+class FakeWrapper:
+    """Records the scripts it runs instead of executing them, the failing statements come
+    back the way the `run_batch` handler reports them."""
+
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.log = list()
+        self.queue = CommandQueue(self.run_batch, error=RuntimeError, batch_error=Failed)
+
+    def run_batch(self, commands):
+        self.log.append([command.statement for command in commands])
+        return [
+            (index, "failed", -1)
+            for index, command in enumerate(commands, 1)
+            if command.statement in self.failing
+        ]
+
+    def read(self, statement):
+        self.queue.flush()
+        self.log.append(statement)
+
+
+@pytest.fixture
+def wrapper():
+    wrapper = FakeWrapper(failing=("click button 2",))
+    yield wrapper
+    input_events.remove_hook(wrapper.queue.flush)
+
+
+def test_flush_on_read(wrapper):
+    with wrapper.queue.batch():
+        wrapper.queue.add("click button 1")
+        wrapper.read("get value")
+        wrapper.queue.add("click button 3")
+    assert wrapper.log == [["click button 1"], "get value", ["click button 3"]]
+
+
+def test_flush_before_input(wrapper):
+    with wrapper.queue.batch():
+        wrapper.queue.add("set value of text field 1 to arg1", ("text",))
+        input_events.before_post()
+        wrapper.log.append("key down")
+        input_events.before_post()  # Nothing is queued anymore.
+    assert wrapper.log == [["set value of text field 1 to arg1"], "key down"]
+
+
+def test_nested_batches(wrapper):
+    with wrapper.queue.batch() as outer:
+        wrapper.queue.add("click button 1")
+        with wrapper.queue.batch() as inner:
+            wrapper.queue.add("click button 3")
+        assert inner is outer and wrapper.log == list()
+    assert not wrapper.queue.is_batching
+    assert wrapper.log == [["click button 1", "click button 3"]]
+
+
+def test_queue_dropped_on_exception(wrapper):
+    with pytest.raises(KeyError):
+        with wrapper.queue.batch():
+            wrapper.queue.add("click button 1")
+            raise KeyError()
+    assert not wrapper.queue.is_batching
+    wrapper.queue.flush()
+    assert wrapper.log == list()
+
+
+def test_failure_origin(wrapper):
+    with pytest.raises(Failed) as error:
+        with wrapper.queue.batch():
+            wrapper.queue.add("click button 1")
+            failing = wrapper.queue.add("click button 2")
+    assert error.value.failures == [failing]
+    assert failing.origin.startswith(f"{__name__}:test_failure_origin:")
+    assert isinstance(failing.error, RuntimeError) and failing.error.args == ("failed", -1)
@@ -0,0 +1,28 @@
+import numpy
+import pytest
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.lib.operating_system.color_lab import delta_e
+from macuitest.lib.operating_system.color_lab import dominant_colors
+from macuitest.lib.operating_system.color_lab import lab_tables
+from macuitest.lib.operating_system.color_lab import to_lab
+from macuitest.lib.operating_system.color_meter import most_common_color
+
+pytestmark = pytest.mark.usefixtures("color_tables_storage")
+
+
+def test_lab_engine_names_palette_colors():
+    colors = numpy.array([rgb for _, *rgb in CSS3_COLORS], dtype=numpy.uint8)
+    lab = to_lab(colors)
+    assert numpy.allclose(delta_e(lab, lab), 0)
+    names = [lab_tables.get().names[i] for i in lab_tables.get().lookup(colors)]
+    assert names == [name for name, *_ in CSS3_COLORS]
+
+
+def test_dominant_colors():
+    pixels = numpy.zeros((10, 10, 3), dtype=numpy.uint8)
+    pixels[:, :7] = (255, 255, 255)
+    pixels[:, 7:] = (255, 0, 0)
+    assert dominant_colors(pixels, count=3) == [("white", 70.0), ("red", 30.0)]
+    assert dominant_colors(pixels, ignore_colors=("white",)) == [("red", 100.0)]
+    assert most_common_color(pixels, ignore_colors=("white",), engine="lab") == "red"
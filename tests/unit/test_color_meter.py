@@ -0,0 +1,67 @@
+from collections import Counter
+
+import cv2
+import numpy
+import pytest
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.config.constants import Point
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.operating_system.color_meter import get_closest_color
+from macuitest.lib.operating_system.color_meter import get_color
+from macuitest.lib.operating_system.color_meter import get_colors
+from macuitest.lib.operating_system.color_meter import get_most_common_color
+from macuitest.lib.operating_system.color_meter import most_common_color
+
+pytestmark = pytest.mark.usefixtures("color_tables_storage")
+
+
+def closest_color(pixel) -> str:
+    min_colours = dict()
+    pr, pg, pb = (int(c) for c in pixel)
+    for name, cr, cg, cb in CSS3_COLORS:
+        min_colours[abs(cr - pr) + abs(cg - pg) + abs(cb - pb)] = name
+    return min_colours[min(min_colours)]
+
+
+def test_closest_color():
+    pixels = numpy.random.default_rng(0).integers(0, 256, (2000, 3), dtype=numpy.uint8)
+    pixels[:3] = ((0, 255, 255), (128, 128, 128), (0, 0, 0))
+    assert [get_closest_color(p) for p in pixels] == [closest_color(p) for p in pixels]
+
+
+def test_most_common_color():
+    rng = numpy.random.default_rng(1)
+    for size in ((1, 1), (4, 6), (30, 20)):
+        pixels = rng.choice([0, 100, 128, 255], (*size, 3)).astype(numpy.uint8)
+        names = [closest_color(pixels[y, x]) for x in range(size[1]) for y in range(size[0])]
+        expected = Counter(names).most_common()[0][0]
+        assert most_common_color(pixels) == expected
+        ignored = (expected,)
+        if len(set(names)) > 1:
+            expected = Counter(n for n in names if n not in ignored).most_common()[0][0]
+            assert most_common_color(pixels, ignored) == expected
+
+
+def test_most_common_color_tie_goes_to_first_column():
+    pixels = numpy.array([[(255, 0, 0), (0, 0, 255)], [(255, 0, 0), (0, 0, 255)]], numpy.uint8)
+    assert most_common_color(pixels) == "red"
+    assert most_common_color(pixels[:, ::-1]) == "blue"
+    assert most_common_color(pixels.transpose(1, 0, 2)) == "red"
+
+
+def test_get_colors_from_one_capture(tmp_path):
+    frame = numpy.zeros((40, 60, 3), dtype=numpy.uint8)
+    frame[:, 30:] = (0, 0, 255)  # BGR red at x >= 15 points on a Retina screen.
+    frame[20:, :] = (0, 255, 0)  # Lime at y >= 10 points.
+    cv2.imwrite(tmp_path.joinpath("frame.png").as_posix(), frame)
+    monitor.set_source(ReplayFrameSource(tmp_path.joinpath("frame.png"), scale=2))
+    try:
+        points = (Point(1, 1), Point(20, 2), Point(25, 15))
+        assert get_colors(points) == ["black", "red", "lime"]
+        assert get_color(Point(16, 9)) == "red"
+        assert get_most_common_color(0, 0, 30, 20) == "lime"
+        assert get_most_common_color(0, 0, 30, 20, ignore_colors=("lime",)) == "black"
+    finally:
+        monitor.set_source(None)
@@ -0,0 +1,29 @@
+import numpy
+
+from macuitest.config.colors import CSS3_COLORS
+from macuitest.config.constants import Colors
+from macuitest.lib.operating_system.color_table import ColorTable
+from macuitest.lib.operating_system.color_table import css3_palette
+
+
+def test_color_table_matches_exact_lookup(tmp_path):
+    pixels = numpy.random.default_rng(0).integers(0, 256, (200, 300, 3), dtype=numpy.uint8)
+    table = ColorTable(CSS3_COLORS, storage=tmp_path)
+    assert (table.lookup(pixels) == table.closest(pixels)).all()
+    assert 0 < table.stats.refined < table.stats.pixels
+
+    stored = ColorTable(CSS3_COLORS, storage=tmp_path)
+    assert isinstance(stored.table, numpy.memmap)
+    assert (stored.lookup(pixels) == table.lookup(pixels)).all()
+
+
+def test_color_table_per_palette(tmp_path):
+    palette = css3_palette(Colors.blue)
+    assert {name for name, *_ in palette} == set(Colors.blue)
+    table = ColorTable(palette, bits=5, storage=tmp_path)
+    assert table.key != ColorTable(CSS3_COLORS, bits=5).key
+    pixels = numpy.array([[0, 0, 255], [250, 250, 250], [0, 191, 255]], dtype=numpy.uint8)
+    expected = ["dodgerblue", "lavender", "deepskyblue"]
+    assert [table.names[i] for i in table.lookup(pixels)] == expected
+    (stored,) = tmp_path.iterdir()
+    assert stored.stat().st_mode & 0o777 == 0o644  # Shared caches are readable by all users.
@@ -0,0 +1,68 @@
+import time
+
+from macuitest.lib.core import CostProportional
+from macuitest.lib.core import ExponentialBackoff
+from macuitest.lib.core import FixedInterval
+from macuitest.lib.core import WaitStats
+from macuitest.lib.core import wait_condition
+
+
+def test_poll_strategies():
+    assert FixedInterval(0.01).delay(attempt=5, cost=1.0) == 0.01
+    backoff = ExponentialBackoff(initial=0.01, factor=2, maximum=0.05)
+    assert [backoff.delay(attempt, 0.0) for attempt in range(1, 5)] == [0.01, 0.02, 0.04, 0.05]
+    proportional = CostProportional(ratio=0.5, minimum=0.01, maximum=0.2)
+    assert [proportional.delay(1, cost) for cost in (0.0, 0.1, 1.0)] == [0.01, 0.05, 0.2]
+
+
+def test_wait_condition_succeeds():
+    attempts = iter(range(5))
+    stats = WaitStats()
+    assert (
+        wait_condition(lambda: next(attempts) == 3 and "done", timeout=1, wait_stats=stats)
+        == "done"
+    )
+    assert (stats.attempts, stats.succeeded) == (4, True)
+    assert stats.time_to_success == stats.elapsed < 1
+
+
+def test_wait_condition_makes_final_attempt_at_deadline():
+    calls = list()
+    stats = WaitStats()
+    poll = FixedInterval(10)
+    assert (
+        wait_condition(
+            lambda: calls.append(time.monotonic()),
+            timeout=0.1,
+            poll_strategy=poll,
+            wait_stats=stats,
+        )
+        is False
+    )
+    assert len(calls) == stats.attempts == 2
+    assert 0.1 <= calls[1] - calls[0] < 0.2
+    assert stats.time_to_success is None
+
+
+def test_wait_condition_swallows_exceptions():
+    def predicate(divisor):
+        return 1 / divisor
+
+    stats = WaitStats()
+    assert wait_condition(predicate, 0.05, (ZeroDivisionError,), 0, wait_stats=stats) is False
+    assert stats.attempts == stats.exceptions > 1
+    assert wait_condition(predicate, 0.05, (ZeroDivisionError,), divisor=2) == 0.5
+
+
+def test_wait_condition_passes_keyword_arguments_through():
+    def predicate(poll, stats, label):
+        return (poll, stats, label)
+
+    assert wait_condition(predicate, 1, poll=1, stats=2, label=3) == (1, 2, 3)
+
+
+def test_wait_condition_zero_timeout_does_not_call_predicate():
+    calls = list()
+    stats = WaitStats()
+    assert wait_condition(lambda: calls.append(1) or True, timeout=0, wait_stats=stats) is False
+    assert calls == list() and stats.attempts == 0
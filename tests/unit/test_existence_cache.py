@@ -0,0 +1,34 @@
+import time
+
+from macuitest.lib.elements.controllers.input_events import input_events
+from macuitest.lib.elements.existence_cache import ExistenceCache
+
+
+def test_existence_cache():
+    cache = ExistenceCache(ttl=0.05)
+    try:
+        assert cache.get('button "OK"', "Finder") is None
+        cache.put('button "OK"', "Finder", True)
+        cache.put('button "OK"', "Safari", False)
+        assert cache.get('button "OK"', "Finder") is True
+        assert cache.get('button "OK"', "Safari") is False
+        assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+        time.sleep(0.06)
+        assert cache.get('button "OK"', "Finder") is None
+    finally:
+        input_events.unsubscribe(cache.invalidate)
+
+
+def test_existence_cache_invalidation():
+    cache = ExistenceCache(ttl=10)
+    try:
+        cache.put("window 1", "Finder", True)
+        input_events.notify()  # E.g. a mouse click.
+        assert cache.get("window 1", "Finder") is None
+        assert cache.stats.invalidations == 1
+    finally:
+        input_events.unsubscribe(cache.invalidate)
+    disabled = ExistenceCache(ttl=0)
+    input_events.unsubscribe(disabled.invalidate)
+    disabled.put("window 1", "Finder", True)
+    assert disabled.get("window 1", "Finder") is None
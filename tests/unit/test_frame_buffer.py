@@ -0,0 +1,80 @@
+import threading
+import time
+
+import numpy
+import pytest
+
+from macuitest.lib.elements.ui.frame_buffer import FrameRingBuffer
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import Monitor
+
+
+def test_ring_buffer():
+    frames = FrameRingBuffer(3, (2, 2))
+    assert frames.latest() == (0, None)
+    for i in range(5):
+        frames.next_slot()[:] = i
+        frames.commit(timestamp=100.0 + i)
+    count, latest = frames.latest()
+    assert count == 5 and (latest == 4).all() and not latest.flags.writeable
+    # Only the two newest slots are served, the oldest one is about to be overwritten.
+    assert [(t, int(f[0, 0])) for t, f in frames.recent()] == [(103.0, 3), (104.0, 4)]
+    assert frames.recent(seconds=1) == list()  # Timestamps are far in the past.
+
+
+def test_ring_buffer_wait_new_frame():
+    frames = FrameRingBuffer(2, (1,))
+    assert frames.wait_new_frame(after=0, timeout=0.01) is False
+    threading.Timer(0.02, frames.commit).start()
+    assert frames.wait_new_frame(after=0, timeout=2) is True
+    assert frames.wait_new_frame(after=0, timeout=0) is True
+
+
+def replay(tmp_path, heights=(40, 40, 40)):
+    for i, height in enumerate(heights):
+        numpy.save(tmp_path.joinpath(f"frame_{i}.npy"), numpy.full((height, 60, 4), i, numpy.uint8))
+    return ReplayFrameSource(tmp_path)
+
+
+@pytest.mark.parametrize("grayscale", [False, True])
+def test_capture(tmp_path, grayscale):
+    monitor = Monitor(replay(tmp_path))
+    monitor.start_capture(fps=100, capacity=4, grayscale=grayscale)
+    try:
+        assert monitor.is_capturing
+        assert monitor.wait_new_frame(after=2, timeout=2)
+        assert monitor.make_snapshot(grayscale=grayscale).shape[:2] == (40, 60)
+    finally:
+        monitor.stop_capture()
+    assert not monitor.is_capturing and monitor.frame_count > 2
+    assert monitor.dump_frames(tmp_path.joinpath("dump"))
+
+
+@pytest.mark.parametrize("grayscale", [False, True])
+def test_capture_stops_on_resolution_change(tmp_path, grayscale):
+    monitor = Monitor(replay(tmp_path, heights=(40, 40, 50)))
+    monitor.start_capture(fps=100, capacity=4, grayscale=grayscale)
+    deadline = time.monotonic() + 2
+    while monitor.is_capturing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not monitor.is_capturing
+    assert monitor.frame_count == 2  # The first two frames, the third one does not fit.
+    assert monitor.wait_new_frame(timeout=1) is False
+    # Snapshots are captured directly again instead of serving the last buffered frame.
+    assert (monitor.make_snapshot() == 0).all()
+    assert monitor.make_snapshot(grayscale=grayscale).shape[0] == 40
+    assert monitor.make_snapshot(grayscale=grayscale).shape[0] == 50
+
+
+def test_capture_serves_copies(tmp_path):
+    monitor = Monitor(replay(tmp_path))
+    monitor.start_capture(fps=100, capacity=2)
+    try:
+        snapshot = monitor.make_snapshot()
+        assert snapshot.flags.owndata and snapshot.flags.writeable
+        view = monitor.make_snapshot(copy=False)
+        assert not view.flags.owndata and not view.flags.writeable
+    finally:
+        monitor.stop_capture()
+    monitor.set_source(None)
+    assert monitor.wait_new_frame(timeout=0) is False
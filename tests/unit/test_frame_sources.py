@@ -0,0 +1,87 @@
+import cv2
+import numpy
+
+from macuitest.config.constants import Region
+from macuitest.config.constants import ScreenSize
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import Monitor
+from macuitest.lib.elements.ui.monitor import SnapshotBuffer
+
+
+def test_replay_frame_source(tmp_path):
+    frames = numpy.random.default_rng(0).integers(0, 255, (3, 40, 60, 3), dtype=numpy.uint8)
+    for i, frame in enumerate(frames):
+        cv2.imwrite(tmp_path.joinpath(f"frame_{i}.png").as_posix(), frame)
+
+    source = ReplayFrameSource(tmp_path, scale=2)
+    assert len(source) == 3
+    assert source.size == ScreenSize(30, 20)
+    assert (source.grab()[..., :3] == frames[0]).all()
+    assert (source.grab(Region(5, 5, 10, 15))[..., :3] == frames[1][10:30, 10:20]).all()
+    assert (source.grab()[..., :3] == frames[2]).all()
+    assert (source.grab()[..., :3] == frames[0]).all()
+    assert source.frame(3) is source.frame(0)  # Decoded once.
+
+
+def test_monitor_reads_replay_stack(tmp_path):
+    frames = numpy.random.default_rng(0).integers(0, 255, (2, 40, 60), dtype=numpy.uint8)
+    numpy.save(tmp_path.joinpath("recording.npy"), frames)
+
+    monitor = Monitor(source=ReplayFrameSource(tmp_path.joinpath("recording.npy")))
+    assert not monitor.is_retina
+    assert monitor.size == ScreenSize(60, 40)
+    assert (monitor.make_snapshot(grayscale=True) == frames[0]).all()
+    assert (
+        monitor.make_snapshot(Region(0, 0, 10, 10), grayscale=True) == frames[1][:10, :10]
+    ).all()
+
+
+def test_snapshot_cache_crops_and_converts(tmp_path):
+    frames = numpy.random.default_rng(0).integers(0, 255, (4, 40, 60, 4), dtype=numpy.uint8)
+    numpy.save(tmp_path.joinpath("recording.npy"), frames)
+    monitor = Monitor(source=ReplayFrameSource(tmp_path.joinpath("recording.npy")))
+
+    with monitor.snapshot_cache(max_age=60) as stats:
+        assert monitor.make_snapshot(Region(0, 0, 60, 40)).shape == (40, 60, 4)  # Full screen.
+        crop = monitor.make_snapshot(Region(10, 5, 30, 25))  # Cut out of the full frame.
+        assert (crop == frames[0][5:25, 10:30]).all()
+        gray = monitor.make_snapshot(Region(12, 6, 20, 10), grayscale=True)  # Converted BGRA.
+        assert (gray == cv2.cvtColor(frames[0], cv2.COLOR_BGRA2GRAY)[6:10, 12:20]).all()
+        assert monitor.make_snapshot(grayscale=True) is monitor.make_snapshot(grayscale=True)
+        assert (stats.hits, stats.misses) == (4, 1)
+
+        monitor.invalidate_cache()
+        monitor.make_snapshot(Region(10, 10, 40, 30), grayscale=True)
+        sub_region = monitor.make_snapshot(Region(20, 15, 30, 25), grayscale=True)
+        assert (sub_region == cv2.cvtColor(frames[1], cv2.COLOR_BGRA2GRAY)[15:25, 20:30]).all()
+        monitor.make_snapshot(Region(20, 15, 30, 25))  # A BGRA request can't use gray frames.
+        monitor.make_snapshot(Region(0, 0, 50, 20), grayscale=True)  # Not contained.
+        assert (stats.hits, stats.misses) == (5, 4)
+
+
+def test_snapshot_buffer_reuses_its_array(tmp_path):
+    frames = numpy.random.default_rng(0).integers(0, 255, (3, 40, 60, 4), dtype=numpy.uint8)
+    numpy.save(tmp_path.joinpath("recording.npy"), frames)
+    buffer = SnapshotBuffer(screen=Monitor(source=ReplayFrameSource(tmp_path / "recording.npy")))
+
+    first = buffer.take(Region(0, 0, 20, 10))
+    assert first.flags.writeable and buffer.take(Region(0, 0, 20, 10)) is first
+    assert (first == cv2.cvtColor(frames[1], cv2.COLOR_BGRA2GRAY)[:10, :20]).all()
+    assert buffer.take(Region(0, 0, 30, 10)).shape == (10, 30)  # Reallocated for a new size.
+
+
+def test_snapshot_cache_drops_old_entries(tmp_path):
+    frames = numpy.random.default_rng(0).integers(0, 255, (4, 40, 60, 4), dtype=numpy.uint8)
+    numpy.save(tmp_path.joinpath("recording.npy"), frames)
+    monitor = Monitor(source=ReplayFrameSource(tmp_path.joinpath("recording.npy")))
+    monitor.cache_max_entries = 2
+
+    with monitor.snapshot_cache(max_age=60) as stats:
+        for x in (0, 20, 40, 0):  # The first region is dropped to make room for the third one.
+            monitor.make_snapshot(Region(x, 0, x + 10, 10))
+        assert (stats.hits, stats.misses) == (0, 4)
+        monitor.make_snapshot(Region(40, 0, 50, 10))
+        assert stats.hits == 1
+        monitor.cache_max_age = 0  # Everything cached is outdated now.
+        monitor.make_snapshot(Region(40, 0, 50, 10))
+        assert stats.misses == 5
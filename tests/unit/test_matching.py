@@ -0,0 +1,63 @@
+import cv2
+import numpy
+
+from macuitest.lib.elements.ui.matching import find_matches
+from macuitest.lib.elements.ui.matching import match_template
+from macuitest.lib.elements.ui.matching import match_template_pyramid
+from macuitest.lib.elements.ui.matching import pyramid_levels
+
+
+def _screen_with_widget(x: int, y: int):
+    rng = numpy.random.default_rng(7)
+    screen = cv2.GaussianBlur(rng.integers(0, 255, (900, 1440), dtype=numpy.uint8), (5, 5), 0)
+    widget = numpy.full((48, 120), 240, dtype=numpy.uint8)
+    cv2.rectangle(widget, (2, 2), (117, 45), 60, 2)
+    cv2.circle(widget, (24, 24), 12, 20, -1)
+    cv2.putText(widget, "OK", (50, 34), 0, 0.9, 0, 2)
+    screen[y : y + 48, x : x + 120] = widget
+    return screen, widget
+
+
+def test_pyramid_levels():
+    assert pyramid_levels(numpy.zeros((20, 200))) == 0
+    assert pyramid_levels(numpy.zeros((40, 200))) == 1
+    assert pyramid_levels(numpy.zeros((400, 400))) == 3
+
+
+def test_pyramid_match_equals_single_scale_match():
+    screen, widget = _screen_with_widget(733, 411)
+    similarity, position = match_template(screen, widget)
+    pyramid_similarity, pyramid_position = match_template_pyramid(screen, widget, 0.925)
+    assert position == (733, 411)
+    assert abs(pyramid_position[0] - position[0]) <= 1
+    assert abs(pyramid_position[1] - position[1]) <= 1
+    assert round(pyramid_similarity, 3) >= 0.925
+
+
+def test_pyramid_match_reports_low_similarity_when_absent():
+    screen, widget = _screen_with_widget(0, 0)
+    screen[:48, :120] = 128
+    similarity, _ = match_template_pyramid(screen, widget, 0.925)
+    assert similarity < 0.925
+
+
+def test_find_matches_returns_every_occurrence():
+    screen, widget = _screen_with_widget(100, 100)
+    for x, y in ((400, 100), (100, 500), (1000, 700)):
+        screen[y : y + 48, x : x + 120] = widget
+    matches = find_matches(screen, widget, 0.925)
+    assert sorted(position for _, position in matches) == [
+        (100, 100),
+        (100, 500),
+        (400, 100),
+        (1000, 700),
+    ]
+    assert all(round(similarity, 3) >= 0.925 for similarity, _ in matches)
+    assert len(find_matches(screen, widget, 0.925, max_results=2)) == 2
+
+
+def test_find_matches_suppresses_plateau_ties():
+    screen = numpy.random.default_rng(3).integers(0, 100, (60, 80), dtype=numpy.uint8)
+    screen[30:35, 20:28], screen[35:40, 20:28] = 0, 255  # The edge matches at 4 positions.
+    matches = find_matches(screen, screen[33:38, 20:25].copy(), 0.99, min_distance=4)
+    assert [position for _, position in matches] == [(20, 33)]
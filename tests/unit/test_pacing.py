@@ -0,0 +1,46 @@
+import numpy
+import pytest
+
+from macuitest.lib.elements.controllers.pacing import PROFILES
+from macuitest.lib.elements.controllers.pacing import Pacing
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import monitor
+
+
+def test_profiles():
+    pacing = Pacing()
+    assert pacing.profile is PROFILES["default"]
+    assert (pacing.profile.after_select, pacing.profile.native_pause) == (0.3, 0.375)
+    with pacing.using("fast", key=0.02) as profile:
+        assert pacing.profile is profile
+        assert (profile.name, profile.key, profile.hold) == ("fast", 0.02, PROFILES["fast"].hold)
+    assert pacing.profile is PROFILES["default"]
+    pacing.use(PROFILES["turbo"])
+    assert pacing.profile.name == "turbo"
+    with pytest.raises(ValueError):
+        pacing.use("slow")
+
+
+def test_delays_and_savings():
+    pacing = Pacing("fast")
+    assert pacing.delay("hold") == PROFILES["fast"].hold
+    assert pacing.delay("hold", seconds=1) == 1  # Explicit delays are not counted.
+    pacing.sleep("after_press")
+    assert pacing.stats.delays == dict(hold=1, after_press=1)
+    default = PROFILES["default"]
+    assert pacing.saved() == pytest.approx(default.hold + default.after_press - 0.05)
+    with pacing.using("default"):
+        assert pacing.settle() is True  # The default profile relies on the delays alone.
+    assert pacing.stats.settles == 0
+
+
+def test_settle(tmp_path):
+    numpy.save(tmp_path.joinpath("recording.npy"), numpy.zeros((20, 600, 800, 3), numpy.uint8))
+    monitor.set_source(ReplayFrameSource(tmp_path.joinpath("recording.npy")))
+    try:
+        pacing = Pacing(PROFILES["fast"])
+        assert pacing.settle((790, 10))
+        assert pacing.stats.settles == 1 and pacing.stats.unsettled == 0
+        assert pacing.saved() == pytest.approx(-pacing.stats.settle_time)
+    finally:
+        monitor.set_source(None)
@@ -0,0 +1,40 @@
+import pytest
+
+from macuitest.lib.applescript_lib.script_cache import ScriptCache
+
+
+def test_script_cache():
+    compiled = list()
+
+    def compiler(source):
+        compiled.append(source)
+        return f"<{source}>"
+
+    cache = ScriptCache(compiler, max_size=2)
+    assert cache.get("a") == "<a>" and cache.get("a") == "<a>"
+    cache.get("b")
+    cache.get("a")  # Now "b" is the least recently used one.
+    cache.get("c")
+    assert ("a" in cache, "b" in cache, "c" in cache) == (True, False, True)
+    assert compiled == ["a", "b", "c"]
+    stats = cache.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 3, 1)
+    assert stats.hit_rate == pytest.approx(0.4)
+
+
+def test_script_cache_limits():
+    def compiler(source):
+        if "error" in source:
+            raise ValueError(source)
+        return source
+
+    cache = ScriptCache(compiler, max_size=10, max_source=5)
+    with pytest.raises(ValueError):
+        cache.get("error")
+    assert "error" not in cache
+    cache.get("abc")
+    cache.get("de")
+    cache.get("f")  # Over the source size limit, drops "abc".
+    assert len(cache) == 2 and "abc" not in cache
+    cache.get("too long")  # Never kept.
+    assert len(cache) == 2 and "too long" not in cache
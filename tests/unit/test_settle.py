@@ -0,0 +1,59 @@
+import time
+
+import numpy
+
+from macuitest.lib.elements.ui.frame_change import FrameChangeDetector
+from macuitest.lib.elements.ui.frame_sources import ReplayFrameSource
+from macuitest.lib.elements.ui.monitor import monitor
+from macuitest.lib.elements.ui.settle import SettleDetector
+from macuitest.lib.elements.ui.settle import ax_digest
+
+
+class Item:
+    def __init__(self, value, children=()):
+        self.value, self.children = value, list(children)
+
+    def get_ax_attribute(self, attribute):
+        return self.children if attribute == "AXChildren" else self.value
+
+
+def test_frame_change_detector():
+    detector, frame = FrameChangeDetector(tile=8), numpy.zeros((20, 30), numpy.uint8)
+    assert detector.update(frame) is None
+    frame[18, 29] = 1  # The bottom right tile is only partly covered by the frame.
+    tiles = detector.update(frame)
+    assert tiles.shape == (3, 4) and tiles.sum() == 1 and tiles[2, 3]
+    assert detector.changed_area(tiles) == (24, 16, 32, 24)
+    assert not detector.update(frame).any()  # Compared to its own copy of the previous frame.
+    assert detector.update(numpy.zeros((10, 10, 4), numpy.uint8)) is None
+
+
+def test_wait_stable():
+    values = iter([1, 2, 3] + [4] * 1000)
+    detector = SettleDetector(quiet=0.02, timeout=1, interval=0.001)
+    started = time.monotonic()
+    assert detector.wait_stable(lambda: next(values))
+    assert time.monotonic() - started < 0.5
+    assert detector.wait_stable(time.monotonic, timeout=0.05) is False
+
+
+def test_wait_screen(tmp_path):
+    frames = numpy.zeros((40, 40, 64, 3), dtype=numpy.uint8)
+    frames[:5] = numpy.arange(5)[:, None, None, None] * 50  # Five different frames first.
+    numpy.save(tmp_path.joinpath("recording.npy"), frames)
+    monitor.set_source(ReplayFrameSource(tmp_path.joinpath("recording.npy")))
+    try:
+        detector = SettleDetector(quiet=0.01, timeout=1, interval=0.001)
+        assert detector.wait_screen()
+        assert monitor.source.position >= 5
+    finally:
+        monitor.set_source(None)
+
+
+def test_ax_digest():
+    tree = Item("window", [Item("button"), Item("text", [Item("deep")])])
+    assert ax_digest(tree) == ax_digest(tree)
+    digest = ax_digest(tree)
+    tree.children[1].children[0].value = "changed"
+    assert ax_digest(tree) != digest
+    assert ax_digest(tree, depth=1) == ax_digest(tree, depth=1)
@@ -0,0 +1,23 @@
+import cv2
+import numpy
+
+from macuitest.lib.elements.ui.template_cache import TemplateCache
+
+
+def test_template_cache(tmp_path):
+    image = numpy.random.default_rng(0).integers(0, 255, (80, 120), dtype=numpy.uint8)
+    screenshot = tmp_path.joinpath("button.png").as_posix()
+    cv2.imwrite(screenshot, image)
+
+    cache = TemplateCache(storage=tmp_path.joinpath("store"))
+    template = cache.load(screenshot)
+    assert cache.load(screenshot) is template
+    assert (template.image == image).all()
+    assert (cache.stats.hits, cache.stats.disk_hits, cache.stats.misses) == (1, 0, 1)
+
+    cold_cache = TemplateCache(storage=tmp_path.joinpath("store"))
+    cold_template = cold_cache.load(screenshot)
+    assert isinstance(cold_template.image, numpy.memmap)
+    assert (cold_template.image == image).all()
+    assert cold_template.small_image.shape == template.small_image.shape
+    assert (cold_cache.stats.disk_hits, cold_cache.stats.misses) == (1, 0)
@@ -0,0 +1,40 @@
+from macuitest.lib.elements.ui_tree import UINode
+
+
+class Missing:
+    code = b"msng"
+
+
+def row(name, size):
+    cells = [[["AXTextField", None, name, None, [0, 0], [10, 10]], []]]
+    cells += [[["AXTextField", None, size, None, [0, 0], [10, 10]], []]]
+    return [["AXRow", Missing(), None, None, [0, 20], [100, 20]], cells]
+
+
+def test_decode_and_query():
+    raw = [["AXTable", "Files", None, None, [10, 20], [300, 200]], [row("a.txt", 1), row("b", 2)]]
+    table = UINode.decode(raw)
+    assert table.role == "AXTable" and table.title == "Files"
+    assert table.get("AXPosition") == (10, 20)
+    assert table.frame.center.x == 160 and table.frame.y2 == 220
+    assert len(list(table.walk())) == 7
+    assert table.count(role="AXRow") == 2
+    assert table.find(role="AXRow").title is None  # Missing values read as None.
+    names = [
+        cell.value
+        for cell in table.find_all(role="AXTextField", value=lambda v: isinstance(v, str))
+    ]
+    assert names == ["a.txt", "b"]
+    assert table.find(value=lambda value: value == 2).role == "AXTextField"
+    assert table.find(lambda node: not node.children, value="b") is not None
+    assert table.find(title="Folders") is None
+    assert hash(table) == hash(UINode.decode(raw))
+
+
+def test_records_are_frozen():
+    def window(specifier):
+        return UINode.decode([["AXWindow", None, specifier, None, None, None], []])
+
+    node = window({"want": "cwin", "seld": 1, "from": None})
+    assert node.value == (("from", None), ("seld", 1), ("want", "cwin"))
+    assert hash(node) == hash(window({"from": None, "seld": 1, "want": "cwin"}))
@@ -0,0 +1,51 @@
+import asyncio
+import csv
+import json
+
+from macuitest.lib import aio
+from macuitest.lib.core import wait_condition
+from macuitest.lib.wait_recorder import WaitRecorder
+
+
+def wait_for_nothing():
+    return wait_condition(lambda: False, timeout=0.02)
+
+
+def test_wait_recorder(tmp_path):
+    recorder = WaitRecorder()
+    with recorder:
+        wait_for_nothing()
+        wait_for_nothing()
+        wait_condition(lambda: True, timeout=1, wait_label="instant")
+    wait_condition(lambda: True, timeout=1, wait_label="not recorded")
+
+    slow, instant = recorder.report()
+    assert slow.label.startswith(f"{__name__}:wait_for_nothing:")
+    assert (slow.calls, slow.timeouts, slow.timeout, slow.timeout_rate) == (2, 2, 0.02, 1.0)
+    assert slow.attempts >= 4 and slow.mean_time_to_success is None
+    assert instant.label == "instant"
+    assert (instant.calls, instant.attempts, instant.histogram[0]) == (1, 1, 1)
+
+    exported = json.loads(recorder.to_json(tmp_path.joinpath("waits.json")).read_text())
+    assert [site["label"] for site in exported["sites"]] == [slow.label, "instant"]
+    with open(recorder.to_csv(tmp_path.joinpath("waits.csv"))) as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["label"] == "instant" and rows[1]["<=0.01s"] == "1"
+
+
+def test_wait_recorder_labels_the_code_calling_the_library():
+    # A stand-in for a library wait such as `UIElement.wait_displayed`.
+    library = dict(__name__="macuitest.lib.elements.fake", wait_condition=wait_condition)
+    exec("def wait_displayed():\n    return wait_condition(lambda: True, timeout=1)", library)
+
+    async def wait_async():
+        return await aio.wait_condition(lambda: True, timeout=1)
+
+    with WaitRecorder() as recorder:
+        library["wait_displayed"]()
+        library["wait_displayed"]()
+        asyncio.run(wait_async())
+    first, second, coroutine = sorted(recorder.sites)
+    assert first.startswith(f"{__name__}:test_wait_recorder_labels_the_code_calling_the_library:")
+    assert first.endswith(" via macuitest.lib.elements.fake:wait_displayed") and first != second
+    assert coroutine.startswith(f"{__name__}:wait_async:") and " via " not in coroutine